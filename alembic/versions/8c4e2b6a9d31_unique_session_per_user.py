@@ -0,0 +1,37 @@
+"""unique session per user
+
+Revision ID: 8c4e2b6a9d31
+Revises: 3f9a1c2d7b10
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2b6a9d31'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest session of each user before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM sessions s
+        USING sessions newer
+        WHERE s.user_id = newer.user_id
+          AND (s.created_at, s.id) < (newer.created_at, newer.id)
+        """
+    )
+    op.create_unique_constraint('uq_sessions_user_id', 'sessions', ['user_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_sessions_user_id', 'sessions', type_='unique')
@@ -0,0 +1,68 @@
+"""add token audit events
+
+Revision ID: a4c7e2d9f1b5
+Revises: f6a1b8c3d9e4
+Create Date: 2026-10-19 14:30:00.000000
+
+Append-only, range-partitioned by month on occurred_at. The running app keeps
+creating the next months' partitions (app/services/token_audit.py); the
+default partition only catches rows no monthly partition covers.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2d9f1b5'
+down_revision: Union[str, Sequence[str], None] = 'f6a1b8c3d9e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+
+def _month_start(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'token_audit_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('event', sa.String(length=32), nullable=False),
+        sa.Column('room_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('roll_no', sa.String(), nullable=True),
+        sa.Column('actor_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'occurred_at'),
+        postgresql_partition_by='RANGE (occurred_at)',
+    )
+    op.create_index(
+        'ix_token_audit_events_room_roll',
+        'token_audit_events',
+        ['room_id', 'roll_no', 'occurred_at'],
+    )
+    op.execute(
+        "CREATE TABLE token_audit_events_default PARTITION OF token_audit_events DEFAULT"
+    )
+
+    this_month = date.today().replace(day=1)
+    for offset in range(MONTHS_AHEAD + 1):
+        start, end = _month_start(this_month, offset), _month_start(this_month, offset + 1)
+        op.execute(
+            f"CREATE TABLE token_audit_events_{start:%Y_%m} PARTITION OF token_audit_events "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('token_audit_events')
@@ -0,0 +1,191 @@
+"""partition attendance tokens
+
+Revision ID: a9e4d2c6f8b3
+Revises: f3a5c7e9b1d4
+Create Date: 2026-10-19 12:00:00.000000
+
+Token uniqueness becomes per room (room_id, token) and room_id joins the
+primary key, so the table can be hash-partitioned on room_id.
+
+Partitioning itself is opt-in: run the upgrade with ATTENDANCE_TOKEN_PARTITIONS
+set (e.g. 16) to move the data into a partitioned table. The move is online:
+a trigger mirrors concurrent writes while rows are copied in chunks, each in
+its own transaction, and only the final rename takes a short exclusive lock.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4d2c6f8b3'
+down_revision: Union[str, Sequence[str], None] = 'f3a5c7e9b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = int(os.getenv("ATTENDANCE_TOKEN_PARTITIONS", "0"))
+CHUNK_SIZE = int(os.getenv("ATTENDANCE_TOKEN_MIGRATION_CHUNK", "5000"))
+
+
+def _mirror_trigger_sql(target: str) -> list[str]:
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION attendance_tokens_mirror() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {target} WHERE id = OLD.id AND room_id = OLD.room_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {target} SELECT NEW.*
+                ON CONFLICT (id, room_id) DO UPDATE SET
+                    roll_no = EXCLUDED.roll_no,
+                    token = EXCLUDED.token,
+                    fingerprint_token = EXCLUDED.fingerprint_token,
+                    assigned_student_id = EXCLUDED.assigned_student_id,
+                    used = EXCLUDED.used,
+                    updated_at = EXCLUDED.updated_at;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER attendance_tokens_mirror
+        AFTER INSERT OR UPDATE OR DELETE ON attendance_tokens
+        FOR EACH ROW EXECUTE FUNCTION attendance_tokens_mirror()
+        """,
+    ]
+
+
+def _copy_in_chunks(source: str, target: str) -> None:
+    """Copy ``source`` into ``target`` ordered by id, one committed chunk at a time."""
+    last_id = None
+    # autocommit: every chunk statement commits on its own
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            last_chunk_id, copied = bind.execute(
+                sa.text(
+                    f"""
+                    WITH chunk AS (
+                        SELECT * FROM {source}
+                        WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)
+                        ORDER BY id
+                        LIMIT :chunk_size
+                    ), copied AS (
+                        INSERT INTO {target} SELECT * FROM chunk
+                        ON CONFLICT (id, room_id) DO NOTHING
+                    )
+                    SELECT max(id::text), count(*) FROM chunk
+                    """
+                ),
+                {"last_id": last_id, "chunk_size": CHUNK_SIZE},
+            ).one()
+            if not copied:
+                break
+            last_id = last_chunk_id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Token uniqueness per room, room_id part of the key (both layouts)
+    op.drop_constraint('attendance_tokens_token_key', 'attendance_tokens', type_='unique')
+    op.create_unique_constraint(
+        'uq_attendance_tokens_room_token', 'attendance_tokens', ['room_id', 'token']
+    )
+    op.drop_constraint('attendance_tokens_pkey', 'attendance_tokens', type_='primary')
+    op.create_primary_key('attendance_tokens_pkey', 'attendance_tokens', ['id', 'room_id'])
+
+    if not PARTITIONS:
+        return
+
+    # 1️⃣ Partitioned twin of the table, indexes under temporary names
+    op.execute(
+        """
+        CREATE TABLE attendance_tokens_new (
+            LIKE attendance_tokens INCLUDING DEFAULTS,
+            CONSTRAINT attendance_tokens_new_pkey PRIMARY KEY (id, room_id),
+            CONSTRAINT uq_attendance_tokens_new_room_token UNIQUE (room_id, token),
+            FOREIGN KEY (room_id) REFERENCES rooms (id) ON DELETE CASCADE,
+            FOREIGN KEY (assigned_student_id) REFERENCES students (id) ON DELETE SET NULL
+        ) PARTITION BY HASH (room_id)
+        """
+    )
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE attendance_tokens_p{remainder} PARTITION OF attendance_tokens_new "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    op.execute(
+        "CREATE INDEX ix_attendance_tokens_new_room_id ON attendance_tokens_new "
+        "(room_id) INCLUDE (used, updated_at)"
+    )
+
+    # 2️⃣ Mirror concurrent writes (committed together with the DDL above
+    #     when the backfill switches to autocommit)
+    for statement in _mirror_trigger_sql("attendance_tokens_new"):
+        op.execute(statement)
+
+    # 3️⃣ Backfill in chunks without holding long locks
+    _copy_in_chunks("attendance_tokens", "attendance_tokens_new")
+
+    # 4️⃣ Swap under a short exclusive lock
+    op.execute("LOCK TABLE attendance_tokens IN ACCESS EXCLUSIVE MODE")
+    # rows deleted while their chunk was being copied
+    op.execute(
+        """
+        DELETE FROM attendance_tokens_new n
+        WHERE NOT EXISTS (
+            SELECT 1 FROM attendance_tokens o WHERE o.id = n.id AND o.room_id = n.room_id
+        )
+        """
+    )
+    op.execute("DROP TRIGGER attendance_tokens_mirror ON attendance_tokens")
+    op.execute("DROP FUNCTION attendance_tokens_mirror()")
+    op.execute("ALTER TABLE attendance_tokens RENAME TO attendance_tokens_unpartitioned")
+    op.execute("ALTER INDEX ix_attendance_tokens_room_id RENAME TO ix_attendance_tokens_unpartitioned_room_id")
+    op.execute("ALTER TABLE attendance_tokens_unpartitioned RENAME CONSTRAINT attendance_tokens_pkey TO attendance_tokens_unpartitioned_pkey")
+    op.execute("ALTER TABLE attendance_tokens_unpartitioned RENAME CONSTRAINT uq_attendance_tokens_room_token TO uq_attendance_tokens_unpartitioned_room_token")
+    op.execute("ALTER TABLE attendance_tokens_new RENAME TO attendance_tokens")
+    op.execute("ALTER INDEX ix_attendance_tokens_new_room_id RENAME TO ix_attendance_tokens_room_id")
+    op.execute("ALTER TABLE attendance_tokens RENAME CONSTRAINT attendance_tokens_new_pkey TO attendance_tokens_pkey")
+    op.execute("ALTER TABLE attendance_tokens RENAME CONSTRAINT uq_attendance_tokens_new_room_token TO uq_attendance_tokens_room_token")
+    op.execute("DROP TABLE attendance_tokens_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    partitioned = op.get_bind().execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'attendance_tokens')"
+        )
+    ).scalar()
+
+    if partitioned:
+        op.execute(
+            """
+            CREATE TABLE attendance_tokens_plain (
+                LIKE attendance_tokens INCLUDING DEFAULTS,
+                FOREIGN KEY (room_id) REFERENCES rooms (id) ON DELETE CASCADE,
+                FOREIGN KEY (assigned_student_id) REFERENCES students (id) ON DELETE SET NULL
+            )
+            """
+        )
+        op.execute("INSERT INTO attendance_tokens_plain SELECT * FROM attendance_tokens")
+        op.execute("DROP TABLE attendance_tokens")
+        op.execute("ALTER TABLE attendance_tokens_plain RENAME TO attendance_tokens")
+        op.create_index(
+            'ix_attendance_tokens_room_id',
+            'attendance_tokens',
+            ['room_id'],
+            postgresql_include=['used', 'updated_at'],
+        )
+    else:
+        op.drop_constraint('attendance_tokens_pkey', 'attendance_tokens', type_='primary')
+        op.drop_constraint('uq_attendance_tokens_room_token', 'attendance_tokens', type_='unique')
+
+    op.create_primary_key('attendance_tokens_pkey', 'attendance_tokens', ['id'])
+    op.create_unique_constraint('attendance_tokens_token_key', 'attendance_tokens', ['token'])
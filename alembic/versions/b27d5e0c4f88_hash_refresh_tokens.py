@@ -0,0 +1,36 @@
+"""hash refresh tokens
+
+Revision ID: b27d5e0c4f88
+Revises: 8c4e2b6a9d31
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b27d5e0c4f88'
+down_revision: Union[str, Sequence[str], None] = '8c4e2b6a9d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sessions', sa.Column('refresh_hash', sa.LargeBinary(length=32), nullable=True))
+    op.execute("UPDATE sessions SET refresh_hash = sha256(convert_to(refresh_token, 'UTF8'))")
+    op.alter_column('sessions', 'refresh_hash', nullable=False)
+    op.create_index(op.f('ix_sessions_refresh_hash'), 'sessions', ['refresh_hash'], unique=False)
+    op.drop_column('sessions', 'refresh_token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Digests cannot be reversed: existing sessions must sign in again
+    op.execute("DELETE FROM sessions")
+    op.add_column('sessions', sa.Column('refresh_token', sa.String(), nullable=False))
+    op.drop_index(op.f('ix_sessions_refresh_hash'), table_name='sessions')
+    op.drop_column('sessions', 'refresh_hash')
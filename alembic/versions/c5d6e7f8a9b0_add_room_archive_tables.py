@@ -0,0 +1,48 @@
+"""add room archive tables
+
+Revision ID: c5d6e7f8a9b0
+Revises: a9e4d2c6f8b3
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, Sequence[str], None] = 'a9e4d2c6f8b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'archived_rooms',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('room_code', sa.String(length=6), nullable=False),
+        sa.Column('room_name', sa.String(length=100), nullable=False),
+        sa.Column('teacher_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'archived_attendance_tokens',
+        sa.Column('room_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('roll_no', sa.String(), nullable=False),
+        sa.Column('assigned_student_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('used', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('room_id', 'roll_no'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('archived_attendance_tokens')
+    op.drop_table('archived_rooms')
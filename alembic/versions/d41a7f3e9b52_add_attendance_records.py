@@ -0,0 +1,42 @@
+"""add attendance records
+
+Revision ID: d41a7f3e9b52
+Revises: b27d5e0c4f88
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7f3e9b52'
+down_revision: Union[str, Sequence[str], None] = 'b27d5e0c4f88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'attendance_records',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('room_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('roll_no', sa.String(), nullable=False),
+        sa.Column('token', sa.String(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('uploaded_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['uploaded_by'], ['teachers.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('room_id', 'roll_no', 'recorded_at', name='uq_attendance_record'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attendance_records')
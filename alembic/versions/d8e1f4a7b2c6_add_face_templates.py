@@ -0,0 +1,97 @@
+"""add face templates
+
+Revision ID: d8e1f4a7b2c6
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-19 13:00:00.000000
+
+Embeddings move from room_face_registry (one copy per room) to face_templates
+(one per student); registry rows reference the template. Existing duplicates
+collapse to the student's most recently enrolled embedding.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e1f4a7b2c6'
+down_revision: Union[str, Sequence[str], None] = 'c5d6e7f8a9b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'face_templates',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('embedding', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id'),
+    )
+
+    # One template per student: the latest enrolment wins
+    op.execute(
+        """
+        INSERT INTO face_templates (id, student_id, embedding, created_at, updated_at)
+        SELECT DISTINCT ON (student_id)
+               gen_random_uuid(), student_id, face_embedding, created_at, created_at
+        FROM room_face_registry
+        ORDER BY student_id, created_at DESC
+        """
+    )
+
+    op.add_column(
+        'room_face_registry',
+        sa.Column('template_id', postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE room_face_registry r
+        SET template_id = t.id
+        FROM face_templates t
+        WHERE t.student_id = r.student_id
+        """
+    )
+    op.alter_column('room_face_registry', 'template_id', nullable=False)
+    op.create_foreign_key(
+        'room_face_registry_template_id_fkey',
+        'room_face_registry',
+        'face_templates',
+        ['template_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+    op.create_index(
+        'ix_room_face_registry_template_id', 'room_face_registry', ['template_id']
+    )
+    op.drop_column('room_face_registry', 'face_embedding')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        'room_face_registry',
+        sa.Column('face_embedding', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE room_face_registry r
+        SET face_embedding = t.embedding
+        FROM face_templates t
+        WHERE t.id = r.template_id
+        """
+    )
+    op.alter_column('room_face_registry', 'face_embedding', nullable=False)
+    op.drop_index('ix_room_face_registry_template_id', table_name='room_face_registry')
+    op.drop_constraint(
+        'room_face_registry_template_id_fkey', 'room_face_registry', type_='foreignkey'
+    )
+    op.drop_column('room_face_registry', 'template_id')
+    op.drop_table('face_templates')
@@ -0,0 +1,55 @@
+"""add room attendance stats
+
+Revision ID: e7b8c9d0a1f2
+Revises: d41a7f3e9b52
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b8c9d0a1f2'
+down_revision: Union[str, Sequence[str], None] = 'd41a7f3e9b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'room_attendance_stats',
+        sa.Column('room_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('joined_count', sa.Integer(), nullable=False),
+        sa.Column('unjoined_count', sa.Integer(), nullable=False),
+        sa.Column('tokens_reissued', sa.Integer(), nullable=False),
+        sa.Column('fingerprint_outstanding', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('room_id'),
+    )
+
+    # Backfill from the current token state; reissues before this point are unknown
+    op.execute(
+        """
+        INSERT INTO room_attendance_stats
+            (room_id, joined_count, unjoined_count, tokens_reissued, fingerprint_outstanding)
+        SELECT r.id,
+               count(t.id) FILTER (WHERE t.used),
+               count(t.id) FILTER (WHERE NOT t.used OR t.used IS NULL),
+               0,
+               count(t.fingerprint_token)
+        FROM rooms r
+        LEFT JOIN attendance_tokens t ON t.room_id = r.id
+        GROUP BY r.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('room_attendance_stats')
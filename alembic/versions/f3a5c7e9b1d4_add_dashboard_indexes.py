@@ -0,0 +1,43 @@
+"""add dashboard indexes
+
+Revision ID: f3a5c7e9b1d4
+Revises: e7b8c9d0a1f2
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a5c7e9b1d4'
+down_revision: Union[str, Sequence[str], None] = 'e7b8c9d0a1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'attendance_tokens',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    op.create_index(
+        'ix_attendance_tokens_room_id',
+        'attendance_tokens',
+        ['room_id'],
+        unique=False,
+        postgresql_include=['used', 'updated_at'],
+    )
+    op.create_index(
+        'ix_rooms_teacher_id_created_at', 'rooms', ['teacher_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rooms_teacher_id_created_at', table_name='rooms')
+    op.drop_index('ix_attendance_tokens_room_id', table_name='attendance_tokens')
+    op.drop_column('attendance_tokens', 'updated_at')
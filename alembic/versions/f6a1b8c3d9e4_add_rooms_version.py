@@ -0,0 +1,30 @@
+"""add rooms version
+
+Revision ID: f6a1b8c3d9e4
+Revises: e2f9a3b6c1d7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1b8c3d9e4'
+down_revision: Union[str, Sequence[str], None] = 'e2f9a3b6c1d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('teachers', sa.Column('rooms_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('students', sa.Column('rooms_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('students', 'rooms_version')
+    op.drop_column('teachers', 'rooms_version')
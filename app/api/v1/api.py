@@ -3,6 +3,9 @@ from app.api.v1.endpoints.auth.teacher_auth_router import router as teacher_auth
 from app.api.v1.endpoints.auth.student_auth_router import router as student_auth_router
 from app.api.v1.endpoints.room.room_teacher_router import router as room_teacher_router
 from app.api.v1.endpoints.room.room_student_router import router as room_student_router
+from app.api.v1.endpoints.room.attendance_upload_router import router as attendance_upload_router
+from app.api.v1.endpoints.room.room_face_router import router as room_face_router
+from app.api.v1.endpoints.batch.batch_router import router as batch_router
 
 
 api_router = APIRouter(prefix="/api/v1")
@@ -12,4 +15,7 @@ api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(teacher_auth_router)
 api_router.include_router(student_auth_router)
 api_router.include_router(room_student_router)
-api_router.include_router(room_teacher_router)
\ No newline at end of file
+api_router.include_router(room_teacher_router)
+api_router.include_router(attendance_upload_router)
+api_router.include_router(room_face_router)
+api_router.include_router(batch_router)
\ No newline at end of file
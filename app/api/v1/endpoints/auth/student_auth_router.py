@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 import uuid
 
@@ -13,7 +15,7 @@ from app.schemas.student_schema import (
 )
 
 from app.utils.security import hash_password, verify_password
-from app.utils.jwt import create_access_token, create_refresh_token
+from app.utils.jwt import create_access_token, create_refresh_token, hash_token
 from app.utils.jwt import SECRET_KEY, ALGORITHM
 from jose import jwt
 from pydantic import BaseModel
@@ -57,22 +59,30 @@ def student_sign_in(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
 
-    # 🔥 Single-device login: remove ALL previous sessions of this user
-    db.query(UserSession).filter(UserSession.user_id == student.id).delete()
-    db.commit()
-
     session_id = uuid.uuid4()
     refresh_token = create_refresh_token(
         {"sub": str(student.id), "sid": str(session_id), "user_type": "student"}
     )
 
-    new_session = UserSession(
+    # 🔥 Single-device login: one upsert replaces the previous session of this user,
+    # so there is no window without a session and sign-in is a single transaction
+    stmt = insert(UserSession).values(
         id=session_id,
         user_id=student.id,
         device_id=payload.device_id,
-        refresh_token=refresh_token,
+        refresh_hash=hash_token(refresh_token),
     )
-    db.add(new_session)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sessions_user_id",
+        set_={
+            "id": stmt.excluded.id,
+            "device_id": stmt.excluded.device_id,
+            "refresh_hash": stmt.excluded.refresh_hash,
+            "created_at": func.now(),
+        },
+    )
+
+    db.execute(stmt)
     db.commit()
 
     access_token = create_access_token(
@@ -118,34 +128,40 @@ def student_refresh_token(payload: RefreshTokenPayload, db: Session = Depends(ge
 
     try:
         sid_uuid = uuid.UUID(str(sid))
+        user_uuid = uuid.UUID(str(user_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
 
-    # find session by sid + refresh_token (rotation-safe)
-    session_obj = (
-        db.query(UserSession)
-        .filter(UserSession.id == sid_uuid, UserSession.refresh_token == refresh_token)
-        .first()
+    # issue new tokens (rotate refresh token)
+    new_refresh = create_refresh_token(
+        {"sub": str(user_id), "sid": str(sid_uuid), "user_type": "student"}
+    )
+    new_access = create_access_token(
+        {"sub": str(user_id), "sid": str(sid_uuid), "user_type": "student"}
     )
 
-    if not session_obj or str(session_obj.user_id) != str(user_id):
+    # compare-and-swap on the stored digest: one round trip, and only one of two
+    # racing refreshes with the same token can win
+    rotated = db.execute(
+        update(UserSession)
+        .where(
+            UserSession.id == sid_uuid,
+            UserSession.user_id == user_uuid,
+            UserSession.refresh_hash == hash_token(refresh_token),
+        )
+        .values(refresh_hash=hash_token(new_refresh))
+        .returning(UserSession.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if not rotated:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session expired or another device logged in with this account",
         )
 
-    # issue new tokens (rotate refresh token)
-    new_refresh = create_refresh_token(
-        {"sub": str(user_id), "sid": str(session_obj.id), "user_type": "student"}
-    )
-    new_access = create_access_token(
-        {"sub": str(user_id), "sid": str(session_obj.id), "user_type": "student"}
-    )
-
-    session_obj.refresh_token = new_refresh
-    db.add(session_obj)
     db.commit()
 
     return {
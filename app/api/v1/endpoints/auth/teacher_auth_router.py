@@ -1,9 +1,12 @@
 #  app/api/v1/endpoints/auth/teacher_auth_router.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 import uuid
 
 from app.database import get_db
+from app.models.room_models import Room
 from app.models.teacher_models import Teacher
 from app.models.session_models import Session as UserSession
 from app.schemas.teacher_schema import (
@@ -11,10 +14,13 @@ from app.schemas.teacher_schema import (
     TeacherLogin,
     TeacherResponse,
     TeacherAuthResponse,
+    TeacherOffboardResponse,
 )
+from app.services.dependencies import get_current_teacher
+from app.services.room_archive import remove_room
 
 from app.utils.security import hash_password, verify_password
-from app.utils.jwt import create_access_token, create_refresh_token
+from app.utils.jwt import create_access_token, create_refresh_token, hash_token
 from app.utils.jwt import SECRET_KEY, ALGORITHM
 from jose import jwt
 from pydantic import BaseModel
@@ -55,23 +61,30 @@ def teacher_sign_in(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
 
-    # 🔥 Single-device login: remove ALL previous sessions of this teacher
-    db.query(UserSession).filter(UserSession.user_id == teacher.id).delete()
-    db.commit()
-
     session_id = uuid.uuid4()
     refresh_token = create_refresh_token(
         {"sub": str(teacher.id), "sid": str(session_id), "user_type": "teacher"}
     )
 
-    new_session = UserSession(
+    # 🔥 Single-device login: one upsert replaces the previous session of this user,
+    # so there is no window without a session and sign-in is a single transaction
+    stmt = insert(UserSession).values(
         id=session_id,
         user_id=teacher.id,
         device_id=payload.device_id,
-        refresh_token=refresh_token,
+        refresh_hash=hash_token(refresh_token),
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sessions_user_id",
+        set_={
+            "id": stmt.excluded.id,
+            "device_id": stmt.excluded.device_id,
+            "refresh_hash": stmt.excluded.refresh_hash,
+            "created_at": func.now(),
+        },
     )
 
-    db.add(new_session)
+    db.execute(stmt)
     db.commit()
 
     access_token = create_access_token(
@@ -116,31 +129,40 @@ def teacher_refresh_token(payload: RefreshTokenPayload, db: Session = Depends(ge
 
     try:
         sid_uuid = uuid.UUID(str(sid))
+        user_uuid = uuid.UUID(str(user_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
 
-    session_obj = (
-        db.query(UserSession)
-        .filter(UserSession.id == sid_uuid, UserSession.refresh_token == refresh_token)
-        .first()
-    )
-
-    if not session_obj or str(session_obj.user_id) != str(user_id):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session or token"
-        )
-
+    # issue new tokens (rotate refresh token)
     new_refresh = create_refresh_token(
-        {"sub": str(user_id), "sid": str(session_obj.id), "user_type": "teacher"}
+        {"sub": str(user_id), "sid": str(sid_uuid), "user_type": "teacher"}
     )
     new_access = create_access_token(
-        {"sub": str(user_id), "sid": str(session_obj.id), "user_type": "teacher"}
+        {"sub": str(user_id), "sid": str(sid_uuid), "user_type": "teacher"}
     )
 
-    session_obj.refresh_token = new_refresh
-    db.add(session_obj)
+    # compare-and-swap on the stored digest: one round trip, and only one of two
+    # racing refreshes with the same token can win
+    rotated = db.execute(
+        update(UserSession)
+        .where(
+            UserSession.id == sid_uuid,
+            UserSession.user_id == user_uuid,
+            UserSession.refresh_hash == hash_token(refresh_token),
+        )
+        .values(refresh_hash=hash_token(new_refresh))
+        .returning(UserSession.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid session or token",
+        )
+
     db.commit()
 
     return {
@@ -148,3 +170,31 @@ def teacher_refresh_token(payload: RefreshTokenPayload, db: Session = Depends(ge
         "refresh_token": new_refresh,
         "token_type": "bearer",
     }
+
+
+# 🚪 OFFBOARD: remove the teacher account, archiving every room in bounded chunks
+@router.delete("/me", response_model=TeacherOffboardResponse)
+def teacher_offboard(
+    archive: bool = Query(True),
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    teacher_id = teacher.id
+    room_ids = [
+        room_id for (room_id,) in db.query(Room.id).filter(Room.teacher_id == teacher_id)
+    ]
+    db.expunge(teacher)
+
+    tokens_removed = 0
+    for room_id in room_ids:
+        tokens_removed += remove_room(db, room_id, archive=archive)
+
+    db.query(UserSession).filter(UserSession.user_id == teacher_id).delete(
+        synchronize_session=False
+    )
+    db.query(Teacher).filter(Teacher.id == teacher_id).delete(synchronize_session=False)
+    db.commit()
+
+    return TeacherOffboardResponse(
+        rooms_removed=len(room_ids), tokens_removed=tokens_removed
+    )
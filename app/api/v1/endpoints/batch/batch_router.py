@@ -0,0 +1,129 @@
+# app/api/v1/endpoints/batch/batch_router.py
+import json
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import BatchContext, batch_context, get_db
+from app.schemas.batch_schema import BatchRequest, BatchResponse, BatchSubResponse
+from app.services.deadlines import reapply_deadline, request_deadline
+from app.services.idempotency import IDEMPOTENT_ROUTES
+from app.services.rate_limit import JOIN_PATH, SIGN_IN_PATHS
+
+
+router = APIRouter(tags=["Batch"])
+
+BATCH_PATH = "/api/v1/batch"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Routes guarded by app middleware (rate limits, join admission, idempotent
+# replay) must be called directly so those guards cannot be bypassed
+_STANDALONE_PATHS = {BATCH_PATH, JOIN_PATH, *SIGN_IN_PATHS, *IDEMPOTENT_ROUTES}
+
+# Forwarded to every sub-request; everything else is per sub-request
+_FORWARDED_HEADERS = {b"authorization", b"user-agent", b"accept-language"}
+
+
+async def _dispatch(
+    request: Request,
+    method: str,
+    path: str,
+    inline_query: str,
+    query: dict | None,
+    body,
+) -> BatchSubResponse:
+    payload = b"" if body is None else json.dumps(body).encode()
+    headers = [(k, v) for k, v in request.scope["headers"] if k in _FORWARDED_HEADERS]
+    if body is not None:
+        headers += [(b"content-type", b"application/json")]
+    headers += [(b"content-length", str(len(payload)).encode())]
+
+    scope = {
+        **request.scope,
+        "method": method.upper(),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": "&".join(
+            part for part in (inline_query, urlencode(query or {}, doseq=True)) if part
+        ).encode(),
+        "headers": headers,
+    }
+    for key in ("router", "endpoint", "path_params", "route"):
+        scope.pop(key, None)
+
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status_code, chunks, content_type = 500, [], b""
+
+    async def send(message):
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    # Straight to the router: exception handlers apply per route, while the
+    # app middleware (rate limit, idempotency, ...) already ran for /batch.
+    # The deadline is the sub-request's own route deadline, not the batch's.
+    with request_deadline(Request(scope)):
+        await run_in_threadpool(reapply_deadline, batch_context.get().db)
+        await request.app.router(scope, receive, send)
+
+    raw = b"".join(chunks)
+    if content_type.startswith(b"application/json") and raw:
+        return BatchSubResponse(status=status_code, body=json.loads(raw))
+    return BatchSubResponse(status=status_code, body=raw.decode(errors="replace") or None)
+
+
+# ===================================
+# 📦 BATCH (one round trip, one auth, one DB session)
+# ===================================
+@router.post("/batch", response_model=BatchResponse)
+async def batch(
+    payload: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """Run sub-requests against existing API routes, in order.
+
+    They share this request's Authorization header, a single principal
+    lookup and a single DB session; each sub-request still commits its own
+    writes. Sign-in, join and token reissue must be sent on their own.
+    """
+    responses = []
+    token = batch_context.set(BatchContext(db=db))
+    try:
+        for sub in payload.requests:
+            path, _, inline_query = sub.path.partition("?")
+            if not path.startswith("/api/v1/") or path in _STANDALONE_PATHS:
+                responses.append(
+                    BatchSubResponse(
+                        status=400, body={"detail": "Path cannot be batched"}
+                    )
+                )
+                continue
+
+            result = await _dispatch(
+                request, sub.method, path, inline_query, sub.query, sub.body
+            )
+            if result.status >= 500:
+                # leave the shared session usable for the next sub-request
+                await run_in_threadpool(db.rollback)
+            elif result.status < 400 and sub.method.upper() not in READ_METHODS:
+                # only then is the client pinned to the primary (app/main.py)
+                request.state.batch_wrote = True
+            responses.append(result)
+    finally:
+        batch_context.reset(token)
+
+    return BatchResponse(responses=responses)
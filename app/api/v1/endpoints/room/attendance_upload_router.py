@@ -0,0 +1,93 @@
+# app/api/v1/endpoints/room/attendance_upload_router.py
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.teacher_models import Teacher
+from app.services.attendance_upload import (
+    UPLOAD_CHUNK_SIZE,
+    iter_lines,
+    parse_record,
+    process_chunk,
+)
+from app.services.dependencies import get_current_teacher
+from app.services.repository import room_by_code
+from app.utils.signed_token import room_key
+
+
+router = APIRouter(prefix="/room", tags=["Room - Teacher"])
+
+# Report lines beyond this size spill to disk instead of staying in memory
+REPORT_SPOOL_BYTES = 1024 * 1024
+
+
+# ===================================
+# 📤 BULK ATTENDANCE UPLOAD (Teacher Only)
+# ===================================
+@router.post("/upload-attendance/{room_code}")
+async def upload_attendance(
+    room_code: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    """Ingest offline check-ins as NDJSON or CSV lines of (roll_no, token, timestamp).
+
+    The body is consumed as a stream and verified chunk by chunk; the response is
+    an NDJSON report with one accept/reject line per record and a final summary.
+    """
+    room = await run_in_threadpool(room_by_code, db, room_code.upper())
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if room.teacher_id != teacher.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not own this room",
+        )
+
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    roll_width = max(len(str(room.starting_roll)), len(str(room.ending_roll)))
+    key = room_key(room.id)
+
+    report = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES, mode="w+")
+    accepted = rejected = 0
+
+    async def flush(chunk):
+        nonlocal accepted, rejected
+        for record in await run_in_threadpool(
+            process_chunk, db, room.id, teacher.id, key, chunk
+        ):
+            report.write(record.report())
+            if record.status == "accepted":
+                accepted += 1
+            else:
+                rejected += 1
+
+    chunk = []
+    line_no = 0
+    async for line in iter_lines(request.stream()):
+        line_no += 1
+        record = parse_record(line_no, line, fmt, roll_width)
+        if record is None:
+            continue
+        chunk.append(record)
+        if len(chunk) >= UPLOAD_CHUNK_SIZE:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+
+    report.write(f'{{"summary": {{"accepted": {accepted}, "rejected": {rejected}}}}}\n')
+    report.seek(0)
+
+    def stream_report():
+        try:
+            yield from report
+        finally:
+            report.close()
+
+    return StreamingResponse(stream_report(), media_type="application/x-ndjson")
@@ -0,0 +1,140 @@
+# app/api/v1/endpoints/room/room_face_router.py
+from typing import List
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.room_models import Room
+from app.models.teacher_models import Teacher
+from app.schemas.face_schema import DuplicateFacePair, FaceEnrollmentResponse
+from app.services.dependencies import get_current_teacher
+from app.services.repository import room_by_code
+from app.services.face_embeddings import (
+    parse_binary_batch,
+    parse_ndjson_batch,
+    prepare_batch,
+    upsert_embeddings,
+)
+from app.services.face_duplicates import DUPLICATE_FACE_THRESHOLD, find_similar_pairs
+from app.services.face_matrix_cache import face_matrix_cache
+
+
+router = APIRouter(prefix="/room", tags=["Room - Faces"])
+
+
+def get_owned_room(db: Session, room_code: str, teacher: Teacher) -> Room:
+    room = room_by_code(db, room_code.upper())
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if room.teacher_id != teacher.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not own this room",
+        )
+    return room
+
+
+# ===================================
+# 🧑‍🤝‍🧑 BULK FACE ENROLLMENT (Teacher Only)
+# ===================================
+@router.post("/{room_code}/faces/bulk", response_model=FaceEnrollmentResponse)
+async def enroll_faces_bulk(
+    room_code: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    """Enroll a batch of (roll_no, embedding) as NDJSON or packed binary
+    (``application/octet-stream``, see ``app/services/face_embeddings.py``)."""
+    body = await request.body()
+    binary = request.headers.get("content-type", "").startswith(
+        "application/octet-stream"
+    )
+
+    def enroll():
+        room = get_owned_room(db, room_code, teacher)
+
+        if binary:
+            roll_nos, embeddings, rejected = parse_binary_batch(body)
+        else:
+            roll_nos, embeddings, rejected = parse_ndjson_batch(body)
+
+        roll_width = max(len(str(room.starting_roll)), len(str(room.ending_roll)))
+        roll_nos = [r.zfill(roll_width) if r.isdigit() else r for r in roll_nos]
+
+        batch = prepare_batch(roll_nos, embeddings, rejected)
+        enrolled = upsert_embeddings(db, room.id, batch)
+        db.commit()
+
+        for roll_no in batch.roll_nos:
+            if roll_no not in enrolled:
+                batch.rejected[roll_no] = "not_joined"
+
+        face_matrix_cache.registry_changed(db, list(set(enrolled.values())))
+
+        return FaceEnrollmentResponse(
+            room_code=room.room_code,
+            enrolled=len(enrolled),
+            rejected=batch.rejected,
+        )
+
+    return await run_in_threadpool(enroll)
+
+
+# ===================================
+# 🕵️ DUPLICATE FACE DETECTION (Teacher Only)
+# ===================================
+@router.get("/{room_code}/faces/duplicates", response_model=List[DuplicateFacePair])
+def find_duplicate_faces(
+    room_code: str,
+    threshold: float = Query(DUPLICATE_FACE_THRESHOLD, gt=0, le=1),
+    across_rooms: bool = Query(False),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    room = get_owned_room(db, room_code, teacher)
+
+    # Same face under two different students is how proxy attendance happens.
+    # A student has a single template shared by all their rooms, so rows are
+    # deduped by template id: every vector is scored once and the remaining
+    # pairs are always between different students.
+    rooms = [room]
+    if across_rooms:
+        rooms = (
+            db.query(Room)
+            .filter(Room.teacher_id == teacher.id)
+            .order_by(Room.created_at)
+            .all()
+        )
+
+    room_codes, roll_nos, matrices = [], [], []
+    seen_templates = set()
+    for each in rooms:
+        entry = face_matrix_cache.get(db, each.id)
+        rows = []
+        for i, template_id in enumerate(entry.template_ids):
+            if template_id not in seen_templates:
+                seen_templates.add(template_id)
+                rows.append(i)
+        room_codes += [each.room_code] * len(rows)
+        roll_nos += [entry.roll_nos[i] for i in rows]
+        matrices.append(entry.vectors(rows))
+
+    rows, cols, similarities = find_similar_pairs(
+        np.concatenate(matrices), threshold=threshold, limit=limit
+    )
+
+    return [
+        DuplicateFacePair(
+            room_code_a=room_codes[i],
+            roll_no_a=roll_nos[i],
+            room_code_b=room_codes[j],
+            roll_no_b=roll_nos[j],
+            similarity=round(float(similarity), 4),
+        )
+        for i, j, similarity in zip(rows.tolist(), cols.tolist(), similarities.tolist())
+    ]
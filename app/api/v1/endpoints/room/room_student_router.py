@@ -1,34 +1,50 @@
 # app/api/v1/endpoints/room/room_student_router.py
-import random
-import string
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.room_models import Room
 from app.models.student_models import Student
 from app.models.attendance_token_models import AttendanceToken
 from app.schemas.room_schema import RoomResponse
 from app.schemas.join_schema import JoinRoomRequest, JoinRoomResponse
 from app.services.dependencies import get_current_student
+from app.services.repository import room_by_code, token_by_roll
+from app.services.room_stats import bump_room_stats
+from app.services.rooms_version import (
+    bump_student_rooms_version,
+    etag_matches,
+    rooms_etag,
+)
+from app.services.token_audit import JOINED, TOKEN_ISSUED, token_audit
+from app.utils.signed_token import ATTENDANCE, mint_token
 
 
 router = APIRouter(prefix="/room", tags=["Room - Student"])
 
 
-def generate_token(length: int = 10) -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
-
-
 # ==================================
 # 📚 GET ALL JOINED ROOMS
 # ==================================
 @router.get("/student/all", response_model=List[RoomResponse])
 def get_student_rooms(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     student: Student = Depends(get_current_student),
 ):
+    # Version read first and from the same session as the list, so a lagging
+    # replica can never pair a new ETag with an old list
+    version = db.scalar(select(Student.rooms_version).where(Student.id == student.id))
+    if version is not None:
+        etag = rooms_etag(student.id, version)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+
     # 1️⃣ Find all tokens assigned to this student
     tokens = (
         db.query(AttendanceToken)
@@ -61,7 +77,7 @@ def join_room(
     student: Student = Depends(get_current_student),
 ):
     # 1️⃣ Find room
-    room = db.query(Room).filter(Room.room_code == payload.room_code.upper()).first()
+    room = room_by_code(db, payload.room_code.upper())
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -74,15 +90,7 @@ def join_room(
     )
 
     # 2️⃣ Find token using student's roll
-    token_entry = (
-        db.query(AttendanceToken)
-        .filter(
-            AttendanceToken.room_id == room.id,
-            AttendanceToken.roll_no == normalized_roll,
-        )
-        .with_for_update()
-        .first()
-    )
+    token_entry = token_by_roll(db, room.id, normalized_roll, for_update=True)
 
     if not token_entry:
         raise HTTPException(
@@ -101,27 +109,37 @@ def join_room(
 
     # Attendance token is also a one-time voucher: return it once, then remove it from the cloud.
     issued_attendance_token = token_entry.token
-    for _ in range(10):
-        rotated = generate_token()
-        exists = (
-            db.query(AttendanceToken).filter(AttendanceToken.token == rotated).first()
-        )
-        if not exists:
-            token_entry.token = rotated
-            break
-    else:
-        raise HTTPException(
-            status_code=500,
-            detail="Could not rotate attendance token. Please try again.",
-        )
+    rotated_token = mint_token(room.id, normalized_roll, ATTENDANCE)
+    token_entry.token = rotated_token
 
     # Fingerprint token is a one-time voucher: return it once, then delete it.
     fingerprint_token = token_entry.fingerprint_token
     if fingerprint_token is not None:
         token_entry.fingerprint_token = None
 
+    db.flush()
+    bump_room_stats(
+        db,
+        room.id,
+        joined_count=1,
+        unjoined_count=-1,
+        fingerprint_outstanding=-1 if fingerprint_token is not None else 0,
+    )
+    bump_student_rooms_version(db, [student.id])
     db.commit()
 
+    token_audit.record(
+        JOINED,
+        room.id,
+        normalized_roll,
+        actor_id=student.id,
+        student_id=student.id,
+        token=issued_attendance_token,
+    )
+    token_audit.record(
+        TOKEN_ISSUED, room.id, normalized_roll, actor_id=student.id, token=rotated_token
+    )
+
     return JoinRoomResponse(
         room_id=room.id,
         room_code=room.room_code,
@@ -1,13 +1,15 @@
 # app/api/v1/endpoints/room/room_teacher_router.py
-import random
-import string
+import base64
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models.room_models import Room
+from app.database import batch_context, get_db, get_read_db, is_primary_sticky
+from app.models.room_models import Room, room_code_seq
+from app.models.room_stats_models import RoomAttendanceStats
 from app.models.attendance_token_models import AttendanceToken
 from app.models.teacher_models import Teacher
 from app.schemas.room_schema import (
@@ -15,24 +17,43 @@ from app.schemas.room_schema import (
     ProvideFingerprintTokenRequest,
     ProvideFingerprintTokenResponse,
     RoomCreate,
+    RoomDashboardItem,
+    RoomDeleteResponse,
     RoomResponse,
+    RoomStatsResponse,
+    RoomVerificationKeyResponse,
 )
 from app.services.dependencies import get_current_teacher
+from app.services.room_archive import remove_room
+from app.services.repository import room_by_code, token_by_roll
+from app.services.room_stats import bump_room_stats, init_room_stats
+from app.services.rooms_version import (
+    bump_student_rooms_version,
+    bump_teacher_rooms_version,
+    etag_matches,
+    rooms_etag,
+)
+from app.services.token_audit import (
+    FINGERPRINT_ISSUED,
+    TOKEN_ISSUED,
+    TOKEN_REISSUED,
+    token_audit,
+)
+from app.utils.room_code import room_code_for
+from app.utils.single_flight import SingleFlight
+from app.utils.signed_token import ATTENDANCE, FINGERPRINT, mint_token, mint_tokens, room_key
 from fastapi import HTTPException, status
 from app.schemas.room_schema import ProvideTokenRequest, ProvideTokenResponse
 
 
 router = APIRouter(prefix="/room", tags=["Room - Teacher"])
 
-
-# 🔐 Generate uppercase room code (6 chars)
-def generate_room_code(length: int = 6) -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
+sync_tokens_flight = SingleFlight("sync_tokens")
 
 
-# 🔐 Generate token for each roll
-def generate_token(length: int = 10) -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
+# 🔐 Allocate uppercase room code (6 chars), unique by construction
+def allocate_room_code(db: Session) -> str:
+    return room_code_for(db.scalar(select(room_code_seq.next_value())))
 
 
 # ==============================
@@ -51,38 +72,54 @@ def create_room(
 
     capacity = end - start + 1
 
-    # 🔥 Ensure unique room_code
-    while True:
-        room_code = generate_room_code()
-        existing = db.query(Room).filter(Room.room_code == room_code).first()
-        if not existing:
+    # 🔥 Sequence + keyed permutation: no lookup needed to ensure a unique room_code.
+    # A clash is only possible with codes issued before the allocator existed,
+    # in which case the savepoint is rolled back and the next value is drawn.
+    for _ in range(5):
+        new_room = Room(
+            room_code=allocate_room_code(db),
+            room_name=payload.room_name,
+            teacher_id=teacher.id,
+            starting_roll=payload.starting_roll,
+            ending_roll=payload.ending_roll,
+            capacity=capacity,
+        )
+        try:
+            with db.begin_nested():
+                db.add(new_room)
+                db.flush()  # get ID before commit
             break
+        except IntegrityError:
+            continue
+    else:
+        raise HTTPException(
+            status_code=500, detail="Could not allocate room code. Please try again."
+        )
 
-    new_room = Room(
-        room_code=room_code,
-        room_name=payload.room_name,
-        teacher_id=teacher.id,
-        starting_roll=payload.starting_roll,
-        ending_roll=payload.ending_roll,
-        capacity=capacity,
-    )
-
-    db.add(new_room)
-    db.flush()  # get ID before commit
-
-    # 🔥 Pre-generate tokens for each roll
-    for roll in range(start, end + 1):
+    # 🔥 Pre-mint signed tokens for each roll in bulk
+    rolls = [str(roll).zfill(roll_width) for roll in range(start, end + 1)]
+    tokens = mint_tokens(new_room.id, rolls, ATTENDANCE)
+    fingerprint_tokens = mint_tokens(new_room.id, rolls, FINGERPRINT)
+    for roll_no, token, fingerprint_token in zip(rolls, tokens, fingerprint_tokens):
         attendance_token = AttendanceToken(
             room_id=new_room.id,
-            roll_no=str(roll).zfill(roll_width),
-            token=generate_token(),
-            fingerprint_token=generate_token(),
+            roll_no=roll_no,
+            token=token,
+            fingerprint_token=fingerprint_token,
         )
         db.add(attendance_token)
 
+    init_room_stats(db, new_room.id, capacity)
+    bump_teacher_rooms_version(db, teacher.id)
+
     db.commit()
     db.refresh(new_room)
 
+    token_audit.record_many(TOKEN_ISSUED, new_room.id, rolls, tokens, actor_id=teacher.id)
+    token_audit.record_many(
+        FINGERPRINT_ISSUED, new_room.id, rolls, fingerprint_tokens, actor_id=teacher.id
+    )
+
     return new_room
 
 
@@ -91,19 +128,83 @@ def create_room(
 # ===================================
 @router.get("/teacher/all", response_model=List[RoomResponse])
 def get_teacher_rooms(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=200),
+    db: Session = Depends(get_read_db),
     teacher: Teacher = Depends(get_current_teacher),
 ):
+    # Version read first and from the same session as the list, so a lagging
+    # replica can never pair a new ETag with an old list
+    version = db.scalar(select(Teacher.rooms_version).where(Teacher.id == teacher.id))
+    if version is not None:
+        etag = rooms_etag(teacher.id, version, offset, limit)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+
     rooms = (
         db.query(Room)
         .filter(Room.teacher_id == teacher.id)
         .order_by(Room.created_at.desc())
+        .offset(offset)
+        .limit(limit)
         .all()
     )
 
     return rooms
 
 
+# ===================================
+# 🧭 TEACHER DASHBOARD (all rooms, one query)
+# ===================================
+@router.get("/teacher/dashboard", response_model=List[RoomDashboardItem])
+def get_teacher_dashboard(
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    # Page the rooms first (same order as /teacher/all), then aggregate only that page
+    page = (
+        select(Room)
+        .where(Room.teacher_id == teacher.id)
+        .order_by(Room.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .subquery()
+    )
+
+    rows = db.execute(
+        select(
+            page.c.id,
+            page.c.room_code,
+            page.c.room_name,
+            page.c.capacity,
+            page.c.created_at,
+            func.count()
+            .filter(AttendanceToken.used.is_(True))
+            .label("joined_count"),
+            func.coalesce(
+                func.max(AttendanceToken.updated_at), page.c.created_at
+            ).label("last_activity_at"),
+        )
+        .outerjoin(AttendanceToken, AttendanceToken.room_id == page.c.id)
+        .group_by(
+            page.c.id,
+            page.c.room_code,
+            page.c.room_name,
+            page.c.capacity,
+            page.c.created_at,
+        )
+        .order_by(page.c.created_at.desc())
+    ).all()
+
+    return rows
+
+
 # ===================================
 # 🔄 PROVIDE NEW TOKEN (Teacher Only)
 # ===================================
@@ -114,7 +215,7 @@ def provide_token(
     teacher: Teacher = Depends(get_current_teacher),
 ):
     # 1️⃣ Find room
-    room = db.query(Room).filter(Room.room_code == payload.room_code).first()
+    room = room_by_code(db, payload.room_code)
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -130,15 +231,8 @@ def provide_token(
     roll_no = payload.roll_no
     normalized_roll = roll_no.zfill(roll_width) if roll_no.isdigit() else roll_no
 
-    # 3️⃣ Find attendance token
-    token_entry = (
-        db.query(AttendanceToken)
-        .filter(
-            AttendanceToken.room_id == room.id,
-            AttendanceToken.roll_no == normalized_roll,
-        )
-        .first()
-    )
+    # 3️⃣ Find attendance token (locked, so the room counters stay consistent with join)
+    token_entry = token_by_roll(db, room.id, normalized_roll, for_update=True)
 
     if not token_entry:
         raise HTTPException(
@@ -146,18 +240,39 @@ def provide_token(
         )
 
     # 4️⃣ Reset token state
+    was_used = token_entry.used
+    previous_student_id = token_entry.assigned_student_id
     token_entry.used = False
     token_entry.assigned_student_id = None
 
-    # 5️⃣ Generate new token
-    token_entry.token = generate_token()
-
+    # 5️⃣ Mint new signed token
+    new_token = mint_token(room.id, normalized_roll, ATTENDANCE)
+    token_entry.token = new_token
+
+    db.flush()
+    bump_room_stats(
+        db,
+        room.id,
+        tokens_reissued=1,
+        joined_count=-1 if was_used else 0,
+        unjoined_count=1 if was_used else 0,
+    )
+    bump_student_rooms_version(db, [previous_student_id])
     db.commit()
 
+    token_audit.record(
+        TOKEN_REISSUED,
+        room.id,
+        normalized_roll,
+        actor_id=teacher.id,
+        student_id=previous_student_id,
+        token=new_token,
+    )
+
     return ProvideTokenResponse(
         room_code=room.room_code,
         roll_no=normalized_roll,
-        token=token_entry.token,
+        token=new_token,
         fingerprint_token=None,
     )
 
@@ -174,7 +289,7 @@ def provide_fingerprint_token(
     db: Session = Depends(get_db),
     teacher: Teacher = Depends(get_current_teacher),
 ):
-    room = db.query(Room).filter(Room.room_code == payload.room_code).first()
+    room = room_by_code(db, payload.room_code)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
@@ -188,27 +303,33 @@ def provide_fingerprint_token(
     roll_no = payload.roll_no
     normalized_roll = roll_no.zfill(roll_width) if roll_no.isdigit() else roll_no
 
-    token_entry = (
-        db.query(AttendanceToken)
-        .filter(
-            AttendanceToken.room_id == room.id,
-            AttendanceToken.roll_no == normalized_roll,
-        )
-        .first()
-    )
+    token_entry = token_by_roll(db, room.id, normalized_roll, for_update=True)
 
     if not token_entry:
         raise HTTPException(
             status_code=404, detail="Roll number not found in this room"
         )
 
-    token_entry.fingerprint_token = generate_token()
+    was_outstanding = token_entry.fingerprint_token is not None
+    fingerprint_token = mint_token(room.id, normalized_roll, FINGERPRINT)
+    token_entry.fingerprint_token = fingerprint_token
+
+    db.flush()
+    bump_room_stats(db, room.id, fingerprint_outstanding=0 if was_outstanding else 1)
     db.commit()
 
+    token_audit.record(
+        FINGERPRINT_ISSUED,
+        room.id,
+        normalized_roll,
+        actor_id=teacher.id,
+        token=fingerprint_token,
+    )
+
     return ProvideFingerprintTokenResponse(
         room_code=room.room_code,
         roll_no=normalized_roll,
-        fingerprint_token=token_entry.fingerprint_token,
+        fingerprint_token=fingerprint_token,
     )
 
 
@@ -218,10 +339,112 @@ def provide_fingerprint_token(
 @router.get("/sync-tokens/{room_code}", response_model=List[AttendanceTokenSyncItem])
 def sync_tokens(
     room_code: str,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    room = room_by_code(db, room_code.upper())
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if room.teacher_id != teacher.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not own this room",
+        )
+
+    # Coalesced after the ownership check: callers that are allowed to see the
+    # room share one query and one serialised (immutable) result
+    room_id = room.id
+
+    def load_tokens():
+        tokens = db.query(AttendanceToken).filter(AttendanceToken.room_id == room_id).all()
+        return [AttendanceTokenSyncItem.model_validate(token) for token in tokens]
+
+    # A caller that just wrote (e.g. provide-token) must read its own write: it
+    # never joins a query that may have started before it, nor one running on
+    # the other database (replica vs primary)
+    if is_primary_sticky(request) or batch_context.get() is not None:
+        return load_tokens()
+    return sync_tokens_flight.do((room_id, db.get_bind().url), load_tokens)
+
+
+# ===================================
+# 🔑 ROOM VERIFICATION KEY (Teacher Only)
+# ===================================
+@router.get(
+    "/verification-key/{room_code}", response_model=RoomVerificationKeyResponse
+)
+def get_room_verification_key(
+    room_code: str,
+    db: Session = Depends(get_read_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    room = room_by_code(db, room_code.upper())
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if room.teacher_id != teacher.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not own this room",
+        )
+
+    # Lets the teacher device verify this room's tokens offline
+    return RoomVerificationKeyResponse(
+        room_code=room.room_code,
+        key=base64.urlsafe_b64encode(room_key(room.id)).decode(),
+    )
+
+
+# ===================================
+# 📊 ROOM ATTENDANCE STATS (Teacher Only)
+# ===================================
+@router.get("/stats/{room_code}", response_model=RoomStatsResponse)
+def get_room_stats(
+    room_code: str,
+    db: Session = Depends(get_read_db),
+    teacher: Teacher = Depends(get_current_teacher),
+):
+    row = (
+        db.query(Room, RoomAttendanceStats)
+        .join(RoomAttendanceStats, RoomAttendanceStats.room_id == Room.id)
+        .filter(Room.room_code == room_code.upper())
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    room, stats = row
+    if room.teacher_id != teacher.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not own this room",
+        )
+
+    return RoomStatsResponse(
+        room_code=room.room_code,
+        capacity=room.capacity,
+        joined_count=stats.joined_count,
+        unjoined_count=stats.unjoined_count,
+        tokens_reissued=stats.tokens_reissued,
+        fingerprint_outstanding=stats.fingerprint_outstanding,
+        attendance_percentage=(
+            round(stats.joined_count * 100 / room.capacity, 2) if room.capacity else 0.0
+        ),
+        updated_at=stats.updated_at,
+    )
+
+
+# ===================================
+# 🗑️ CLOSE / DELETE ROOM (Teacher Only)
+# ===================================
+@router.delete("/{room_code}", response_model=RoomDeleteResponse)
+def delete_room(
+    room_code: str,
+    archive: bool = Query(True),
     db: Session = Depends(get_db),
     teacher: Teacher = Depends(get_current_teacher),
 ):
-    room = db.query(Room).filter(Room.room_code == room_code.upper()).first()
+    room = room_by_code(db, room_code.upper())
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     if room.teacher_id != teacher.id:
@@ -230,5 +453,12 @@ def sync_tokens(
             detail="You do not own this room",
         )
 
-    tokens = db.query(AttendanceToken).filter(AttendanceToken.room_id == room.id).all()
-    return tokens
+    room_id, room_code = room.id, room.room_code
+    db.expunge(room)
+
+    # Set-based and chunked: tokens are never loaded into the ORM
+    tokens_removed = remove_room(db, room_id, archive=archive)
+
+    return RoomDeleteResponse(
+        room_code=room_code, archived=archive, tokens_removed=tokens_removed
+    )
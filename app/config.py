@@ -0,0 +1,6 @@
+# app/config.py
+# Loads .env once per process. Modules that read settings with os.getenv
+# import this module first instead of calling load_dotenv themselves.
+from dotenv import load_dotenv
+
+load_dotenv()
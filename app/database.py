@@ -1,10 +1,14 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from fastapi import Request
 
-from dotenv import load_dotenv
+from app import config  # noqa: F401  (loads .env)
 import os
-load_dotenv()
+import time
 
 
 USER = os.getenv("user")
@@ -15,14 +19,82 @@ DBNAME = os.getenv("dbname")
 
 DATABASE_URL = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}?sslmode=require"
 
+# Optional read replica: only the host is required, the rest defaults to the primary's
+REPLICA_HOST = os.getenv("replica_host")
+REPLICA_PORT = os.getenv("replica_port", PORT)
+REPLICA_SSLMODE = os.getenv("replica_sslmode", "require")
+
+REPLICA_DATABASE_URL = (
+    f"postgresql+psycopg2://{USER}:{PASSWORD}@{REPLICA_HOST}:{REPLICA_PORT}/{DBNAME}?sslmode={REPLICA_SSLMODE}"
+    if REPLICA_HOST
+    else None
+)
+
+# Read-your-writes: a client that just wrote is pinned to the primary for a few seconds
+PRIMARY_STICKY_COOKIE = "primary_sticky"
+PRIMARY_STICKY_HEADER = "X-Primary-Sticky"
+PRIMARY_STICKY_SECONDS = int(os.getenv("PRIMARY_STICKY_SECONDS", "5"))
+
+# Hash-partition attendance_tokens on room_id into this many partitions (0 = plain table)
+ATTENDANCE_TOKEN_PARTITIONS = int(os.getenv("ATTENDANCE_TOKEN_PARTITIONS", "0"))
+
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+replica_engine = create_engine(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else None
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None
+    else None
+)
+
+# Sub-requests of POST /batch share the batch's session and resolved principal
+@dataclass
+class BatchContext:
+    db: Session
+    principals: dict = field(default_factory=dict)
+
+
+batch_context: ContextVar[BatchContext | None] = ContextVar("batch_context", default=None)
+
+
 def get_db():
+    batch = batch_context.get()
+    if batch is not None:
+        yield batch.db
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def is_primary_sticky(request: Request) -> bool:
+    marker = request.cookies.get(PRIMARY_STICKY_COOKIE) or request.headers.get(
+        PRIMARY_STICKY_HEADER
+    )
+    try:
+        return marker is not None and float(marker) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request):
+    # Read-only handlers go to the replica unless the client wrote recently
+    if (
+        ReplicaSessionLocal is None
+        or batch_context.get() is not None
+        or is_primary_sticky(request)
+    ):
+        yield from get_db()
+        return
+
+    db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,11 +1,112 @@
-from fastapi import FastAPI
+import hmac
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.exc import OperationalError
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.batch.batch_router import BATCH_PATH, READ_METHODS
+from app.database import (
+    PRIMARY_STICKY_COOKIE,
+    PRIMARY_STICKY_HEADER,
+    PRIMARY_STICKY_SECONDS,
+    engine,
+    replica_engine,
+)
+from app.services.circuit_breaker import (
+    breaker,
+    circuit_breaker_middleware,
+    stale_cache,
+)
+from app.services.deadlines import (
+    DeadlineExceeded,
+    db_timeout_handler,
+    deadline_exceeded_handler,
+    deadline_middleware,
+)
+from app.services.idempotency import idempotency_middleware
+from app.services.profiler import (
+    ADMIN_TOKEN,
+    PROFILE_MAX_SECONDS,
+    ProfilerBusy,
+    collapsed,
+    profiler,
+    profiler_middleware,
+)
+from app.services.rate_limit import join_admission_middleware, rate_limit_middleware
+from app.services.token_audit import token_audit
+from app.services.warmup import warm_pool, warm_process
+from app.utils.single_flight import single_flight_stats
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A preloading master (gunicorn.conf.py) already ran warm_process before fork
+    warm_process()
+    await run_in_threadpool(warm_pool)
+    token_audit.start()
+    yield
+    await run_in_threadpool(token_audit.stop)
+    engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
 
-app = FastAPI(title="SmartAttend API")
+
+app = FastAPI(title="SmartAttend API", lifespan=lifespan)
 
 # Mount API v1 router
 app.include_router(api_router)
 
+# Statement / lock timeouts surface as 504 / 503 (see app/services/deadlines.py)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+app.add_exception_handler(OperationalError, db_timeout_handler)
+
+# Middleware added later wraps the earlier ones (outermost last):
+#   profiler -> rate limit -> circuit breaker -> deadline -> primary stickiness
+#   -> idempotent replay -> join admission -> routes
+app.middleware("http")(join_admission_middleware)
+
+# Replays retried writes that carry an Idempotency-Key (see app/services/idempotency.py)
+app.middleware("http")(idempotency_middleware)
+
+
+@app.middleware("http")
+async def mark_primary_sticky(request: Request, call_next):
+    response = await call_next(request)
+
+    # After a successful write, keep this client's reads on the primary for a
+    # while. A batch only counts as a write if one of its sub-requests wrote.
+    if request.url.path == BATCH_PATH:
+        wrote = getattr(request.state, "batch_wrote", False)
+    else:
+        wrote = request.method not in READ_METHODS and response.status_code < 400
+    if replica_engine is not None and wrote:
+        sticky_until = str(int(time.time()) + PRIMARY_STICKY_SECONDS)
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE, sticky_until, max_age=PRIMARY_STICKY_SECONDS
+        )
+        response.headers[PRIMARY_STICKY_HEADER] = sticky_until
+
+    return response
+
+
+# Per-route deadline, enforced as DB statement/lock timeouts
+app.middleware("http")(deadline_middleware)
+
+
+# Fail fast / serve last-known-good reads while the database is degraded
+app.middleware("http")(circuit_breaker_middleware)
+
+
+# Token buckets per IP / account / room for sign-in and join (app/services/rate_limit.py)
+app.middleware("http")(rate_limit_middleware)
+
+
+# Names the route for threadpool work while a profile runs (app/services/profiler.py)
+app.middleware("http")(profiler_middleware)
+
 
 @app.get("/")
 def root():
@@ -16,3 +117,37 @@ def root():
 def ping():
     return {"message": "ping successful"}
 
+
+@app.get("/metrics")
+def metrics():
+    # Per-worker counters
+    return {
+        "single_flight": single_flight_stats(),
+        "token_audit": token_audit.stats(),
+        "circuit_breaker": breaker.stats(),
+        "stale_cache": stale_cache.stats(),
+    }
+
+
+@app.post("/admin/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    x_admin_token: str | None = Header(None),
+):
+    # Sampling profiler for this worker; collapsed stacks, root frame = route
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    try:
+        stacks, ticks = await run_in_threadpool(
+            profiler.run, app, seconds, interval_ms / 1000
+        )
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    return PlainTextResponse(collapsed(stacks), headers={"X-Profile-Ticks": str(ticks)})
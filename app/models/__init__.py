@@ -1,6 +1,12 @@
+from .archive_models import ArchivedAttendanceToken, ArchivedRoom
+from .attendance_record_models import AttendanceRecord
 from .attendance_token_models import AttendanceToken
+from .face_template_models import FaceTemplate
+from .idempotency_models import IdempotencyKey
 from .room_face_registry_models import RoomFaceRegistry
 from .room_models import Room
+from .room_stats_models import RoomAttendanceStats
 from .session_models import Session
 from .student_models import Student
 from .teacher_models import Teacher
+from .token_audit_models import TokenAuditEvent
@@ -0,0 +1,41 @@
+# models/archive_models.py
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, Integer, Boolean, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+# Cold storage for deleted rooms: no foreign keys and no secondary indexes,
+# so archiving never slows down the hot tables.
+class ArchivedRoom(Base):
+    __tablename__ = "archived_rooms"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+
+    room_code: Mapped[str] = mapped_column(String(6), nullable=False)
+    room_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    teacher_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+
+class ArchivedAttendanceToken(Base):
+    __tablename__ = "archived_attendance_tokens"
+
+    room_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    roll_no: Mapped[str] = mapped_column(String, primary_key=True)
+
+    assigned_student_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
+    used: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
@@ -0,0 +1,45 @@
+# models/attendance_record_models.py
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+# Check-ins collected on the teacher device (e.g. offline) and uploaded in bulk
+class AttendanceRecord(Base):
+    __tablename__ = "attendance_records"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    room_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False
+    )
+
+    roll_no: Mapped[str] = mapped_column(String, nullable=False)
+
+    token: Mapped[str] = mapped_column(String, nullable=False)
+
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    uploaded_by: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("teachers.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    uploaded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "room_id", "roll_no", "recorded_at", name="uq_attendance_record"
+        ),
+    )
@@ -1,10 +1,13 @@
 # models/attendance_token_models.py
 import uuid
-from sqlalchemy import String, Boolean, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import DDL, String, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
-from app.database import Base
+from app.database import ATTENDANCE_TOKEN_PARTITIONS, Base
 
 
 class AttendanceToken(Base):
@@ -14,13 +17,17 @@ class AttendanceToken(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
+    # Part of the key so the table can be hash-partitioned on it; every lookup
+    # filters on room_id, which lets Postgres prune to a single partition.
     room_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("rooms.id", ondelete="CASCADE"),
+        primary_key=True,
     )
 
     roll_no: Mapped[str] = mapped_column(String, nullable=False)
 
-    token: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    token: Mapped[str] = mapped_column(String, nullable=False)
 
     fingerprint_token: Mapped[str | None] = mapped_column(String, nullable=True)
 
@@ -32,5 +39,39 @@ class AttendanceToken(Base):
 
     used: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    # Last join / reissue on this roll; drives "last activity" on the dashboard
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
     room = relationship("Room", back_populates="tokens")
     student = relationship("Student", back_populates="attendance_tokens")
+
+    __table_args__ = (
+        # Signed tokens are unique per room; a partitioned table can only
+        # enforce uniqueness together with the partition key anyway.
+        UniqueConstraint("room_id", "token", name="uq_attendance_tokens_room_token"),
+        # Covering index for per-room aggregates (index-only scans)
+        Index(
+            "ix_attendance_tokens_room_id",
+            "room_id",
+            postgresql_include=["used", "updated_at"],
+        ),
+        {"postgresql_partition_by": "HASH (room_id)"}
+        if ATTENDANCE_TOKEN_PARTITIONS
+        else {},
+    )
+
+
+# create_all() on a partitioned layout also needs the partitions themselves
+for remainder in range(ATTENDANCE_TOKEN_PARTITIONS):
+    event.listen(
+        AttendanceToken.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE attendance_tokens_p{remainder} PARTITION OF attendance_tokens "
+            f"FOR VALUES WITH (MODULUS {ATTENDANCE_TOKEN_PARTITIONS}, REMAINDER {remainder})"
+        ),
+    )
@@ -0,0 +1,48 @@
+# models/face_template_models.py
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+# One face embedding per student, shared by every room the student is enrolled in
+class FaceTemplate(Base):
+    __tablename__ = "face_templates"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("students.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+
+    # L2-normalised embedding as a JSON array
+    embedding: Mapped[list] = mapped_column(
+        JSONB,
+        nullable=False
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    student = relationship("Student")
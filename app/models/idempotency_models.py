@@ -0,0 +1,36 @@
+# models/idempotency_models.py
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+# Responses of retried writes (Idempotency-Key), shared by all workers
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # sha256(scope | Idempotency-Key); the raw key is never stored
+    key_hash: Mapped[bytes] = mapped_column(LargeBinary(32), primary_key=True)
+
+    # NULL while the first request is still running
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Encrypted under a key derived from the client's Idempotency-Key
+    response_body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+
+    media_type: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    # Lease expiry while running, replay expiry once completed
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True
+    )
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import ForeignKey, DateTime, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -36,10 +36,13 @@ class RoomFaceRegistry(Base):
         nullable=False
     )
 
-    # Store embedding safely
-    face_embedding: Mapped[dict] = mapped_column(
-        JSONB,
-        nullable=False
+    # Room membership references the student's face template instead of
+    # carrying its own copy of the embedding
+    template_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("face_templates.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -50,6 +53,7 @@ class RoomFaceRegistry(Base):
     # Relationships
     room = relationship("Room")
     student = relationship("Student")
+    template = relationship("FaceTemplate")
 
     __table_args__ = (
         UniqueConstraint("room_id", "roll_no", name="uq_room_roll_face"),
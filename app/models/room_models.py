@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, Sequence
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,10 @@ from sqlalchemy.sql import func
 from app.database import Base
 
 
+# Feeds the room code allocator (see app/utils/room_code.py)
+room_code_seq = Sequence("room_code_seq", start=1, metadata=Base.metadata)
+
+
 class Room(Base):
     __tablename__ = "rooms"
 
@@ -53,8 +57,16 @@ class Room(Base):
     teacher = relationship("Teacher", back_populates="rooms")
 
     # 🔥 AttendanceToken relationship (room ↔ student bridge)
+    # passive_deletes: the DB-side ON DELETE CASCADE removes tokens, the ORM
+    # never loads them just to delete them one by one
     tokens = relationship(
         "AttendanceToken",
         back_populates="room",
-        cascade="all, delete-orphan"
-    )
\ No newline at end of file
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Teacher room list / dashboard pages, newest first
+        Index("ix_rooms_teacher_id_created_at", "teacher_id", "created_at"),
+    )
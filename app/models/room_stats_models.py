@@ -0,0 +1,33 @@
+# models/room_stats_models.py
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+# Per-room counters, updated inside the same transactions that change attendance_tokens
+class RoomAttendanceStats(Base):
+    __tablename__ = "room_attendance_stats"
+
+    room_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("rooms.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    joined_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unjoined_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tokens_reissued: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fingerprint_outstanding: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
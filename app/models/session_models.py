@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, DateTime
+from sqlalchemy import String, DateTime, LargeBinary, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -26,10 +26,18 @@ class Session(Base):
 
     device_id: Mapped[str] = mapped_column(String, nullable=False)
 
-    refresh_token: Mapped[str] = mapped_column(String, nullable=False)
+    # sha256 of the current refresh token; rotation swaps it atomically
+    refresh_hash: Mapped[bytes] = mapped_column(
+        LargeBinary(32), nullable=False, index=True
+    )
 
     # ✅ FIXED
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now()
+    )
+
+    # Single-device login: sign-in upserts on this constraint
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_sessions_user_id"),
     )
\ No newline at end of file
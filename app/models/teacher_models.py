@@ -1,6 +1,6 @@
 # models/teacher_models.py
 import uuid
-from sqlalchemy import String, DateTime
+from sqlalchemy import String, DateTime, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -27,9 +27,18 @@ class Teacher(Base):
 
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
 
+    # Bumped whenever this user's room list changes; validator for ETags
+    rooms_version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default="0"
+    )
+
     created_at: Mapped[datetime] = mapped_column(
     DateTime(timezone=True),
     server_default=func.now()
     )
 
-    rooms = relationship("Room", back_populates="teacher", cascade="all, delete")
\ No newline at end of file
+    rooms = relationship(
+        "Room", back_populates="teacher", cascade="all, delete", passive_deletes=True
+    )
\ No newline at end of file
@@ -0,0 +1,58 @@
+# models/token_audit_models.py
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DDL, DateTime, Index, LargeBinary, String, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Append-only history of attendance / fingerprint token lifecycle events.
+# Range-partitioned by month on occurred_at, so old months can be detached or
+# dropped wholesale. No foreign keys: the trail outlives deleted rooms/users.
+class TokenAuditEvent(Base):
+    __tablename__ = "token_audit_events"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+
+    # Partition key, hence part of the primary key
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True
+    )
+
+    event: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    room_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+    roll_no: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    # Teacher or student that caused the event
+    actor_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    student_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    # sha256 of the token involved; tokens themselves are one-time vouchers
+    token_hash: Mapped[bytes | None] = mapped_column(LargeBinary(32), nullable=True)
+
+    __table_args__ = (
+        Index("ix_token_audit_events_room_roll", "room_id", "roll_no", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+
+# Catch-all partition, so an insert never fails for lack of a monthly one
+event.listen(
+    TokenAuditEvent.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE token_audit_events_default "
+        "PARTITION OF token_audit_events DEFAULT"
+    ),
+)
@@ -0,0 +1,26 @@
+# schemas/batch_schema.py
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+BATCH_MAX_REQUESTS = 20
+
+
+class BatchSubRequest(BaseModel):
+    method: str = "GET"
+    path: str  # e.g. /api/v1/room/sync-tokens/ABC123
+    query: dict[str, Any] | None = None
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchSubRequest] = Field(min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: list[BatchSubResponse]
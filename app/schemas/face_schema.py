@@ -0,0 +1,16 @@
+# schemas/face_schema.py
+from pydantic import BaseModel
+
+
+class FaceEnrollmentResponse(BaseModel):
+    room_code: str
+    enrolled: int
+    rejected: dict[str, str] = {}
+
+
+class DuplicateFacePair(BaseModel):
+    room_code_a: str
+    roll_no_a: str
+    room_code_b: str
+    roll_no_b: str
+    similarity: float
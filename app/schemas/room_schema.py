@@ -57,6 +57,19 @@ class RoomResponse(BaseModel):
         from_attributes = True
 
 
+class RoomDashboardItem(BaseModel):
+    id: UUID
+    room_code: str
+    room_name: str
+    capacity: int
+    joined_count: int
+    created_at: datetime
+    last_activity_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ProvideTokenRequest(BaseModel):
     room_code: str
     roll_no: str
@@ -113,3 +126,25 @@ class AttendanceTokenSyncItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RoomVerificationKeyResponse(BaseModel):
+    room_code: str
+    key: str
+
+
+class RoomStatsResponse(BaseModel):
+    room_code: str
+    capacity: int
+    joined_count: int
+    unjoined_count: int
+    tokens_reissued: int
+    fingerprint_outstanding: int
+    attendance_percentage: float
+    updated_at: datetime | None = None
+
+
+class RoomDeleteResponse(BaseModel):
+    room_code: str
+    archived: bool
+    tokens_removed: int
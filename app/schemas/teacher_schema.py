@@ -50,3 +50,8 @@ class TeacherAuthResponse(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str = "bearer"
+
+
+class TeacherOffboardResponse(BaseModel):
+    rooms_removed: int
+    tokens_removed: int
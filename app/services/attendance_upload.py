@@ -0,0 +1,193 @@
+# app/services/attendance_upload.py
+import csv
+import hmac
+import io
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+from app.utils.signed_token import ATTENDANCE, verify_token
+
+# Records are verified and written this many at a time, so an upload of any
+# size only ever holds one chunk in memory.
+UPLOAD_CHUNK_SIZE = 1000
+
+
+@dataclass
+class UploadRecord:
+    line_no: int
+    roll_no: str | None = None
+    token: str | None = None
+    recorded_at: datetime | None = None
+    id: uuid.UUID | None = None
+    status: str = "pending"
+    reason: str | None = None
+
+    def reject(self, reason: str) -> None:
+        self.status = "rejected"
+        self.reason = reason
+
+    def report(self) -> str:
+        item = {"line": self.line_no, "roll_no": self.roll_no, "status": self.status}
+        if self.reason:
+            item["reason"] = self.reason
+        return json.dumps(item) + "\n"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, (int, float)) or str(value).replace(".", "", 1).isdigit():
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    parsed = datetime.fromisoformat(str(value))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_record(line_no: int, line: str, fmt: str, roll_width: int) -> UploadRecord | None:
+    """Parse one NDJSON / CSV line of ``(roll_no, token, timestamp)``.
+
+    Returns ``None`` for blank lines and a CSV header row.
+    """
+    if not line.strip():
+        return None
+
+    record = UploadRecord(line_no=line_no)
+    try:
+        if fmt == "csv":
+            fields = next(csv.reader([line]))
+            if fields and fields[0].strip().lower() == "roll_no":
+                return None
+            roll_no, token, timestamp = (field.strip() for field in fields)
+        else:
+            item = json.loads(line)
+            roll_no, token, timestamp = item["roll_no"], item["token"], item["timestamp"]
+
+        roll_no = str(roll_no)
+        record.roll_no = roll_no.zfill(roll_width) if roll_no.isdigit() else roll_no
+        record.token = str(token).upper()
+        record.recorded_at = _parse_timestamp(timestamp)
+    except (ValueError, KeyError, TypeError, OverflowError, OSError):
+        # OverflowError / OSError: timestamps outside what the platform can represent
+        record.reject("malformed")
+
+    return record
+
+
+_ROLL_STATE = text(
+    """
+    SELECT r.roll_no, t.token, t.used
+    FROM unnest(:roll_nos) AS r(roll_no)
+    LEFT JOIN attendance_tokens t
+      ON t.room_id = :room_id AND t.roll_no = r.roll_no
+    """
+).bindparams(
+    bindparam("roll_nos", type_=ARRAY(String)),
+    bindparam("room_id", type_=UUID(as_uuid=True)),
+)
+
+_INSERT_STAGED = text(
+    """
+    INSERT INTO attendance_records (id, room_id, roll_no, token, recorded_at, uploaded_by)
+    SELECT id, :room_id, roll_no, token, recorded_at, :teacher_id
+    FROM attendance_upload_staging
+    ON CONFLICT ON CONSTRAINT uq_attendance_record DO NOTHING
+    RETURNING id
+    """
+).bindparams(
+    bindparam("room_id", type_=UUID(as_uuid=True)),
+    bindparam("teacher_id", type_=UUID(as_uuid=True)),
+)
+
+
+def process_chunk(
+    db: Session,
+    room_id: uuid.UUID,
+    teacher_id: uuid.UUID,
+    key: bytes,
+    records: list[UploadRecord],
+) -> list[UploadRecord]:
+    """Verify and persist one chunk of records in a single transaction."""
+    # 1️⃣ Authenticity: signed tokens are checked in-process, no DB round trip
+    pending = [r for r in records if r.status == "pending"]
+    for record in pending:
+        if not verify_token(record.token, record.roll_no, ATTENDANCE, key=key):
+            record.reject("invalid_token")
+
+    # 2️⃣ Revocation: one set-based join for every roll in the chunk
+    pending = [r for r in pending if r.status == "pending"]
+    if pending:
+        roll_nos = sorted({r.roll_no for r in pending})
+        state_by_roll = {
+            roll_no: (token, used)
+            for roll_no, token, used in db.execute(
+                _ROLL_STATE, {"roll_nos": roll_nos, "room_id": room_id}
+            )
+        }
+        for record in pending:
+            token, used = state_by_roll.get(record.roll_no, (None, None))
+            if token is None:
+                record.reject("unknown_roll")
+            elif not used or not hmac.compare_digest(
+                token.encode(), record.token.encode()
+            ):
+                # not the token currently issued for the roll, or it was
+                # reissued and nobody has joined with the new one yet
+                record.reject("revoked")
+            else:
+                record.id = uuid.uuid4()
+
+    # 3️⃣ Persist accepted records: COPY into a staging table, then one insert
+    pending = [r for r in pending if r.status == "pending"]
+    if pending:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in pending:
+            writer.writerow(
+                [record.id, record.roll_no, record.token, record.recorded_at.isoformat()]
+            )
+        buffer.seek(0)
+
+        raw_connection = db.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS attendance_upload_staging (
+                    id uuid, roll_no text, token text, recorded_at timestamptz
+                ) ON COMMIT DELETE ROWS
+                """
+            )
+            cursor.copy_expert(
+                "COPY attendance_upload_staging (id, roll_no, token, recorded_at) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+        inserted = {
+            str(inserted_id)
+            for inserted_id in db.execute(
+                _INSERT_STAGED, {"room_id": room_id, "teacher_id": teacher_id}
+            ).scalars()
+        }
+        for record in pending:
+            if str(record.id) in inserted:
+                record.status = "accepted"
+            else:
+                record.reject("duplicate")
+
+    db.commit()
+    return records
@@ -0,0 +1,273 @@
+# app/services/circuit_breaker.py
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import event
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.api.v1.endpoints.batch.batch_router import BATCH_PATH
+from app.database import engine
+from app.services.deadlines import LOCK_NOT_AVAILABLE
+
+# Circuit breaker on the primary engine. Every statement outcome is recorded;
+# errors and slow statements count as failures. When the failure ratio over
+# the recent window crosses the threshold the breaker opens: writes fail fast
+# with 503 and reads (GETs and all-GET batches) are answered from a
+# last-known-good cache, marked stale.
+# After CB_OPEN_SECONDS one probe request is let through (half-open); its
+# outcome closes the breaker again or re-opens it.
+CB_WINDOW = int(os.getenv("CB_WINDOW", "20"))
+CB_MIN_CALLS = int(os.getenv("CB_MIN_CALLS", "10"))
+CB_FAILURE_RATIO = float(os.getenv("CB_FAILURE_RATIO", "0.5"))
+CB_SLOW_QUERY_MS = float(os.getenv("CB_SLOW_QUERY_MS", "2000"))
+CB_OPEN_SECONDS = float(os.getenv("CB_OPEN_SECONDS", "10"))
+CB_PROBE_TIMEOUT_SECONDS = float(os.getenv("CB_PROBE_TIMEOUT_SECONDS", "5"))
+
+STALE_CACHE_MAX_BYTES = int(os.getenv("STALE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Older entries are never served (they are keyed by access token, which expires)
+STALE_CACHE_MAX_AGE_SECONDS = int(os.getenv("STALE_CACHE_MAX_AGE_SECONDS", "900"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self.state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=CB_WINDOW)  # True = failure
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """May a request use the database right now?"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= CB_OPEN_SECONDS:
+                self.state = HALF_OPEN
+                self._probe_started = None
+            if self.state == HALF_OPEN and (
+                self._probe_started is None
+                or now - self._probe_started >= CB_PROBE_TIMEOUT_SECONDS
+            ):
+                self._probe_started = now  # this request is the probe
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> int:
+        with self._lock:
+            left = CB_OPEN_SECONDS - (time.monotonic() - self._opened_at)
+        return max(1, math.ceil(left))
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == OPEN:
+                return
+
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if (
+                len(self._outcomes) >= CB_MIN_CALLS
+                and failures / len(self._outcomes) >= CB_FAILURE_RATIO
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.trips += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "trips": self.trips, "rejected": self.rejected}
+
+
+breaker = CircuitBreaker()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("breaker_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_success(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["breaker_started"].pop()
+    breaker.record((time.perf_counter() - started) * 1000 > CB_SLOW_QUERY_MS)
+
+
+@event.listens_for(engine, "handle_error")
+def _record_error(context):
+    if context.connection is not None and context.connection.info.get("breaker_started"):
+        context.connection.info["breaker_started"].pop()
+
+    # Only signs of an unhealthy database: connection failures, timeouts.
+    # Constraint violations and lock contention are the application's business.
+    if getattr(context.original_exception, "pgcode", None) == LOCK_NOT_AVAILABLE:
+        return
+    if context.is_disconnect or isinstance(
+        context.sqlalchemy_exception, (OperationalError, InterfaceError)
+    ):
+        breaker.record(True)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    body: bytes
+    media_type: str | None
+    stored_at: float  # wall clock, for the Age header
+
+
+class StaleCache:
+    """Bounded (by bytes) LRU of the last good GET response per caller and URL."""
+
+    def __init__(self, max_bytes: int = STALE_CACHE_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.served = 0
+
+    @staticmethod
+    def key(request: Request, body: bytes = b"") -> bytes:
+        return hashlib.sha256(
+            b"|".join(
+                [
+                    request.url.path.encode(),
+                    request.url.query.encode(),
+                    request.headers.get("authorization", "").encode(),
+                    hashlib.sha256(body).digest(),
+                ]
+            )
+        ).digest()
+
+    def put(self, key: bytes, body: bytes, media_type: str | None) -> None:
+        if len(body) > self._max_bytes // 16:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = _Entry(body, media_type, time.time())
+            self._bytes += len(body)
+            while self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def get(self, key: bytes) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry.stored_at > STALE_CACHE_MAX_AGE_SECONDS:
+                return None
+            self._entries.move_to_end(key)
+            self.served += 1
+            return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "served": self.served}
+
+
+stale_cache = StaleCache()
+
+
+def _stale_response(entry: _Entry) -> Response:
+    return Response(
+        content=entry.body,
+        media_type=entry.media_type,
+        headers={
+            "Age": str(int(time.time() - entry.stored_at)),
+            "Warning": '110 - "Response is Stale"',
+            "X-Served-Stale": "true",
+        },
+    )
+
+
+def _unavailable() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable. Please retry shortly."},
+        headers={"Retry-After": str(breaker.retry_after())},
+    )
+
+
+def _read_only_batch(body: bytes) -> bool:
+    try:
+        requests = json.loads(body)["requests"]
+        return bool(requests) and all(
+            # BatchSubRequest.method defaults to GET
+            str(sub.get("method", "GET")).upper() == "GET" for sub in requests
+        )
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return False
+
+
+def _failed(body: bytes) -> bool:
+    # A batch answers 200 even when sub-requests hit the database and failed
+    try:
+        return any(sub["status"] >= 500 for sub in json.loads(body)["responses"])
+    except (ValueError, KeyError, TypeError):
+        return True
+
+
+async def circuit_breaker_middleware(request: Request, call_next):
+    if not request.url.path.startswith("/api/v1/"):
+        return await call_next(request)
+
+    # GETs, and batches made only of GETs (the teacher cold start), are reads
+    batch = request.method == "POST" and request.url.path == BATCH_PATH
+    body = await request.body() if batch else b""
+    cacheable = request.method == "GET" or (batch and _read_only_batch(body))
+    key = stale_cache.key(request, body) if cacheable else None
+
+    if not breaker.allow():
+        entry = stale_cache.get(key) if cacheable else None
+        return _stale_response(entry) if entry is not None else _unavailable()
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        entry = stale_cache.get(key) if cacheable else None
+        if entry is None:
+            raise
+        return _stale_response(entry)
+
+    if not cacheable:
+        return response
+    if response.status_code >= 500:
+        # stale-if-error: a failed read falls back to the last good answer
+        entry = stale_cache.get(key)
+        return _stale_response(entry) if entry is not None else response
+    if response.status_code != 200:
+        return response
+
+    content = b"".join([chunk async for chunk in response.body_iterator])
+    if batch and _failed(content):
+        entry = stale_cache.get(key)
+        if entry is not None:
+            return _stale_response(entry)
+    else:
+        stale_cache.put(key, content, response.headers.get("content-type"))
+    return Response(
+        content=content, status_code=response.status_code, headers=dict(response.headers)
+    )
@@ -0,0 +1,141 @@
+# app/services/deadlines.py
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from starlette.routing import Match
+
+from app.database import ReplicaSessionLocal, SessionLocal
+
+# Every request gets a deadline; each DB transaction it opens is limited to
+# the time left (SET LOCAL statement_timeout / lock_timeout), so a query stuck
+# behind a hot room's row locks is cancelled by Postgres and its pooled
+# connection comes back, instead of waiting long after the client gave up.
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "15"))
+DB_LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "1000"))
+
+# (method, route path) -> seconds; None disables the deadline (chunked jobs
+# that commit as they go)
+ROUTE_DEADLINES: dict[tuple[str, str], float | None] = {
+    ("POST", "/api/v1/room/join"): 3,
+    ("POST", "/api/v1/room/provide-token"): 3,
+    ("POST", "/api/v1/room/provide-fingerprint-token"): 3,
+    ("POST", "/api/v1/student/sign_in"): 5,
+    ("POST", "/api/v1/teacher/sign_in"): 5,
+    ("GET", "/api/v1/room/sync-tokens/{room_code}"): 10,
+    ("POST", "/api/v1/room/{room_code}/faces/bulk"): 60,
+    ("GET", "/api/v1/room/{room_code}/faces/duplicates"): 60,
+    ("POST", "/api/v1/room/upload-attendance/{room_code}"): 120,
+    ("DELETE", "/api/v1/room/{room_code}"): None,
+    ("DELETE", "/api/v1/teacher/me"): None,
+}
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+# Postgres SQLSTATEs
+QUERY_CANCELED = "57014"
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def _apply_deadline(session, transaction, connection) -> None:
+    deadline = _deadline.get()
+    if deadline is None:
+        return
+
+    remaining_ms = int((deadline - time.monotonic()) * 1000)
+    if remaining_ms <= 0:
+        raise DeadlineExceeded()
+
+    # One round trip for both (transaction-local, like SET LOCAL)
+    connection.exec_driver_sql(
+        "SELECT set_config('statement_timeout', %s, true),"
+        " set_config('lock_timeout', %s, true)",
+        (str(remaining_ms), str(min(remaining_ms, DB_LOCK_TIMEOUT_MS))),
+    )
+
+
+@contextmanager
+def without_deadline():
+    """Run bookkeeping (e.g. idempotency records) outside the request's budget.
+
+    It must complete even when the request itself finished right at its
+    deadline, or a committed write would be reported as failed.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+event.listen(SessionLocal, "after_begin", _apply_deadline)
+if ReplicaSessionLocal is not None:
+    event.listen(ReplicaSessionLocal, "after_begin", _apply_deadline)
+
+
+def route_deadline(request: Request) -> float | None:
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            key = (request.method, getattr(route, "path", ""))
+            return ROUTE_DEADLINES.get(key, REQUEST_DEADLINE_SECONDS)
+    return REQUEST_DEADLINE_SECONDS
+
+
+@contextmanager
+def request_deadline(request: Request):
+    seconds = route_deadline(request)
+    token = _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def reapply_deadline(session) -> None:
+    """Apply the current deadline to a transaction that is already open.
+
+    For a session shared across requests (POST /batch): timeouts are
+    otherwise only set when a transaction begins.
+    """
+    if not session.in_transaction():
+        return
+    connection = session.connection()
+    if _deadline.get() is not None:
+        _apply_deadline(session, None, connection)
+    else:
+        connection.exec_driver_sql("SET LOCAL statement_timeout TO DEFAULT")
+        connection.exec_driver_sql("SET LOCAL lock_timeout TO DEFAULT")
+
+
+async def deadline_middleware(request: Request, call_next):
+    with request_deadline(request):
+        return await call_next(request)
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+
+async def db_timeout_handler(request: Request, exc: OperationalError):
+    code = getattr(exc.orig, "pgcode", None)
+    if code == QUERY_CANCELED:
+        return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+    if code == LOCK_NOT_AVAILABLE:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Resource is busy. Please retry shortly."},
+            headers={"Retry-After": "1"},
+        )
+    raise exc
@@ -6,19 +6,28 @@ from jose import jwt, JWTError
 import os
 import uuid
 
-from app.database import get_db
-from app.models.session_models import Session as UserSession
+from app.database import batch_context, get_db
 from app.models.teacher_models import Teacher
 from app.models.student_models import Student
+from app.services.repository import session_exists, student_by_id, teacher_by_id
+from app.utils.single_flight import SingleFlight
 
 security = HTTPBearer()
 
+student_lookup_flight = SingleFlight("student_lookup")
+
 
 def get_current_teacher(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> Teacher:
 
+    # Inside POST /batch the principal is resolved once for all sub-requests
+    batch = batch_context.get()
+    cache_key = ("teacher", credentials.credentials)
+    if batch is not None and cache_key in batch.principals:
+        return batch.principals[cache_key]
+
     try:
         payload = jwt.decode(
             credentials.credentials,
@@ -51,28 +60,21 @@ def get_current_teacher(
             )
 
         # Immediate logout on other device: session must still exist
-        session_obj = (
-            db.query(UserSession)
-            .filter(
-                UserSession.id == session_uuid,
-                UserSession.user_id == teacher_uuid,
-            )
-            .first()
-        )
-
-        if not session_obj:
+        if not session_exists(db, session_uuid, teacher_uuid):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Session expired or logged in on another device",
             )
 
-        teacher = db.query(Teacher).filter(Teacher.id == teacher_uuid).first()
+        teacher = teacher_by_id(db, teacher_uuid)
 
         if not teacher:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Teacher not found"
             )
 
+        if batch is not None:
+            batch.principals[cache_key] = teacher
         return teacher
 
     except JWTError:
@@ -81,11 +83,36 @@ def get_current_teacher(
         )
 
 
+def load_student(db: Session, student_uuid: uuid.UUID, session_uuid: uuid.UUID) -> Student:
+    if not session_exists(db, session_uuid, student_uuid):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session expired or logged in on another device",
+        )
+
+    student = student_by_id(db, student_uuid)
+
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Student not found"
+        )
+
+    # Shared with coalesced callers on other sessions: detach it
+    db.expunge(student)
+    return student
+
+
 def get_current_student(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> Student:
 
+    # Inside POST /batch the principal is resolved once for all sub-requests
+    batch = batch_context.get()
+    cache_key = ("student", credentials.credentials)
+    if batch is not None and cache_key in batch.principals:
+        return batch.principals[cache_key]
+
     try:
         payload = jwt.decode(
             credentials.credentials,
@@ -117,28 +144,13 @@ def get_current_student(
                 detail="Invalid token",
             )
 
-        session_obj = (
-            db.query(UserSession)
-            .filter(
-                UserSession.id == session_uuid,
-                UserSession.user_id == student_uuid,
-            )
-            .first()
+        # Parallel calls from one client resolve the principal once
+        student = student_lookup_flight.do(
+            (student_uuid, session_uuid),
+            lambda: load_student(db, student_uuid, session_uuid),
         )
-
-        if not session_obj:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session expired or logged in on another device",
-            )
-
-        student = db.query(Student).filter(Student.id == student_uuid).first()
-
-        if not student:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Student not found"
-            )
-
+        if batch is not None:
+            batch.principals[cache_key] = student
         return student
 
     except JWTError:
@@ -0,0 +1,171 @@
+# app/services/embedding_store.py
+import fcntl
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+
+# On-disk, memory-mapped copies of each room's embedding matrix. Every worker
+# maps the same read-only files, so the vectors live once in the page cache
+# instead of once per worker heap. Disabled unless a directory is configured.
+#
+#   {EMBEDDING_STORE_DIR}/{room_id}/CURRENT          -> "v<version>"
+#   {EMBEDDING_STORE_DIR}/{room_id}/v<version>/meta.json
+#                                             embeddings.npy     float32 (n, dim)
+#   or, with EMBEDDING_STORE_QUANTIZED=1 (a quarter of the size):
+#                                             embeddings_q8.npy  int8    (n, dim)
+#                                             scales.npy         float32 (n,)
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR")
+EMBEDDING_STORE_QUANTIZED = os.getenv("EMBEDDING_STORE_QUANTIZED", "0") == "1"
+EMBEDDING_STORE_KEEP_VERSIONS = 2
+
+
+def quantize_int8(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantisation: ``row ~= q * scale``."""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize(matrix: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """float32 copy of (a slice of) a stored matrix, rows L2-normalised again."""
+    if scales is None:
+        return np.array(matrix, dtype=np.float32)
+    vectors = matrix.astype(np.float32) * scales[:, None]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@dataclass(frozen=True)
+class StoredRoomEmbeddings:
+    version: str
+    roll_nos: list[str]
+    student_ids: list[uuid.UUID]
+    template_ids: list[uuid.UUID]
+    matrix: np.ndarray  # float32, or int8 when quantised; memory-mapped read-only
+    scales: np.ndarray | None = None  # per-row scale of an int8 matrix
+
+
+class EmbeddingStore:
+    def __init__(self, root: str, quantized: bool = EMBEDDING_STORE_QUANTIZED):
+        self.root = root
+        self.quantized = quantized
+
+    def _room_dir(self, room_id: uuid.UUID) -> str:
+        return os.path.join(self.root, str(room_id))
+
+    def current_version(self, room_id: uuid.UUID) -> str | None:
+        try:
+            with open(os.path.join(self._room_dir(room_id), "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def open(self, room_id: uuid.UUID) -> StoredRoomEmbeddings | None:
+        version = self.current_version(room_id)
+        if version is None:
+            return None
+
+        path = os.path.join(self._room_dir(room_id), version)
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            if "template_ids" not in meta:
+                return None  # written before face templates; caller republishes
+
+            scales = None
+            if os.path.exists(os.path.join(path, "embeddings_q8.npy")):
+                matrix = np.load(os.path.join(path, "embeddings_q8.npy"), mmap_mode="r")
+                scales = np.load(os.path.join(path, "scales.npy"), mmap_mode="r")
+            else:
+                matrix = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        except FileNotFoundError:
+            # CURRENT moved on and this version was pruned under us: a miss
+            return None
+
+        return StoredRoomEmbeddings(
+            version=version,
+            roll_nos=meta["roll_nos"],
+            student_ids=[uuid.UUID(s) for s in meta["student_ids"]],
+            template_ids=[uuid.UUID(t) for t in meta["template_ids"]],
+            matrix=matrix,
+            scales=scales,
+        )
+
+    def publish(
+        self,
+        room_id: uuid.UUID,
+        roll_nos: list[str],
+        student_ids: list[uuid.UUID],
+        template_ids: list[uuid.UUID],
+        matrix: np.ndarray,
+        as_of_ns: int | None = None,
+    ) -> StoredRoomEmbeddings | None:
+        """Write a new version of a room's matrix and switch readers to it atomically.
+
+        ``as_of_ns`` is when the caller started reading the registry (the
+        version is named after it), so versions order by the data they hold,
+        not by when their files happened to be written.
+        """
+        room_dir = self._room_dir(room_id)
+        os.makedirs(room_dir, exist_ok=True)
+
+        version = f"v{as_of_ns if as_of_ns is not None else time.time_ns()}"
+        staging = os.path.join(room_dir, f".{version}.tmp")
+        os.makedirs(staging)
+
+        if self.quantized:
+            quantized, scales = quantize_int8(matrix)
+            np.save(os.path.join(staging, "embeddings_q8.npy"), quantized)
+            np.save(os.path.join(staging, "scales.npy"), scales)
+        else:
+            np.save(os.path.join(staging, "embeddings.npy"), matrix)
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "roll_nos": roll_nos,
+                    "student_ids": [str(s) for s in student_ids],
+                    "template_ids": [str(t) for t in template_ids],
+                },
+                f,
+            )
+
+        # Publish: the version directory appears complete, then CURRENT flips.
+        # Publishers of the same room serialise on a lock file, and CURRENT
+        # only ever moves forward: a rebuild that read the registry earlier
+        # never replaces one that read it later, whichever finishes first.
+        os.rename(staging, os.path.join(room_dir, version))
+        with open(os.path.join(room_dir, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            current = self.current_version(room_id)
+            if current is None or int(current[1:]) < int(version[1:]):
+                pointer = os.path.join(room_dir, f".CURRENT.{version}")
+                with open(pointer, "w") as f:
+                    f.write(version)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(pointer, os.path.join(room_dir, "CURRENT"))
+            self._prune(room_dir)
+        return self.open(room_id)
+
+    def _prune(self, room_dir: str) -> None:
+        # Readers that still map an older version keep working: unlinked files
+        # stay valid until their last mapping goes away.
+        versions = sorted(
+            (name for name in os.listdir(room_dir) if name.startswith("v")),
+            key=lambda name: int(name[1:]),
+        )
+        for name in versions[:-EMBEDDING_STORE_KEEP_VERSIONS]:
+            shutil.rmtree(os.path.join(room_dir, name), ignore_errors=True)
+
+    def remove(self, room_id: uuid.UUID) -> None:
+        shutil.rmtree(self._room_dir(room_id), ignore_errors=True)
+
+
+embedding_store = EmbeddingStore(EMBEDDING_STORE_DIR) if EMBEDDING_STORE_DIR else None
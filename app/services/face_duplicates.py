@@ -0,0 +1,62 @@
+# app/services/face_duplicates.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DUPLICATE_FACE_THRESHOLD = float(os.getenv("DUPLICATE_FACE_THRESHOLD", "0.8"))
+
+# A block pair costs block_size^2 float32 scores (16 MiB at 2048), per worker
+DUPLICATE_BLOCK_SIZE = int(os.getenv("DUPLICATE_BLOCK_SIZE", "2048"))
+DUPLICATE_WORKERS = int(os.getenv("DUPLICATE_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def _top(scores: np.ndarray, threshold: float, limit: int | None) -> np.ndarray:
+    """Flat indices of the (at most ``limit``) highest scores >= threshold."""
+    flat = scores.ravel()
+    hits = np.flatnonzero(flat >= threshold)
+    if limit is not None and len(hits) > limit:
+        hits = hits[np.argpartition(flat[hits], -limit)[-limit:]]
+    return hits
+
+
+def find_similar_pairs(
+    matrix: np.ndarray,
+    threshold: float = DUPLICATE_FACE_THRESHOLD,
+    limit: int | None = None,
+    block_size: int = DUPLICATE_BLOCK_SIZE,
+    workers: int = DUPLICATE_WORKERS,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs ``i < j`` of L2-normalised rows with cosine similarity >= threshold.
+
+    The n x n similarity matrix is never materialised: the upper triangle is
+    tiled into block pairs, each scored with one matrix product on a thread
+    pool (NumPy releases the GIL inside BLAS). With ``limit``, each tile keeps
+    only its top ``limit`` pairs, so a low threshold cannot blow up memory.
+    Returns ``(rows, cols, similarities)``, most similar first.
+    """
+    n = len(matrix)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    starts = range(0, n, block_size)
+    tiles = [(a, b) for a in starts for b in starts if b >= a]
+
+    def score(tile):
+        a, b = tile
+        scores = matrix[a : a + block_size] @ matrix[b : b + block_size].T
+        if a == b:
+            # upper triangle only; 0 never passes since threshold > 0
+            scores = np.triu(scores, k=1)
+        rows, cols = np.unravel_index(_top(scores, threshold, limit), scores.shape)
+        return rows + a, cols + b, scores[rows, cols]
+
+    empty = (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32))
+    if not tiles:
+        return empty
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(score, tiles))
+
+    rows, cols, similarities = (np.concatenate(column) for column in zip(*parts))
+    keep = _top(similarities, threshold, limit)
+    keep = keep[np.argsort(-similarities[keep], kind="stable")]
+    return rows[keep], cols[keep], similarities[keep]
@@ -0,0 +1,193 @@
+# app/services/face_embeddings.py
+import json
+import os
+import struct
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+FACE_EMBEDDING_DIM = int(os.getenv("FACE_EMBEDDING_DIM", "128"))
+
+# Binary batches are a sequence of records:
+#   roll_len:uint16 LE | roll_no utf-8 | FACE_EMBEDDING_DIM x float32 LE
+_ROLL_LEN = struct.Struct("<H")
+
+
+@dataclass
+class EnrollmentBatch:
+    roll_nos: list[str]
+    vectors: np.ndarray  # (n, FACE_EMBEDDING_DIM) float32, L2-normalised
+    rejected: dict[str, str]  # roll_no / line -> reason
+
+
+def parse_ndjson_batch(body: bytes) -> tuple[list[str], list, dict[str, str]]:
+    roll_nos, embeddings, rejected = [], [], {}
+    for line_no, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            roll_nos.append(str(item["roll_no"]))
+            embeddings.append(item["embedding"])
+        except (ValueError, KeyError, TypeError):
+            rejected[f"line {line_no}"] = "malformed"
+    return roll_nos, embeddings, rejected
+
+
+def parse_binary_batch(body: bytes) -> tuple[list[str], np.ndarray, dict[str, str]]:
+    vector_bytes = FACE_EMBEDDING_DIM * 4
+    roll_nos, offsets, rejected = [], [], {}
+    view = memoryview(body)
+    offset, record_no = 0, 1
+    while offset < len(view):
+        if offset + _ROLL_LEN.size > len(view):
+            rejected["trailer"] = "truncated"
+            return roll_nos, _gather(view, offsets), rejected
+        (roll_len,) = _ROLL_LEN.unpack_from(view, offset)
+        offset += _ROLL_LEN.size
+        end = offset + roll_len + vector_bytes
+        if end > len(view):
+            rejected["trailer"] = "truncated"
+            return roll_nos, _gather(view, offsets), rejected
+        try:
+            roll_nos.append(bytes(view[offset : offset + roll_len]).decode())
+        except UnicodeDecodeError:
+            rejected[f"record {record_no}"] = "malformed"
+        else:
+            offsets.append(offset + roll_len)
+        offset = end
+        record_no += 1
+    return roll_nos, _gather(view, offsets), rejected
+
+
+def _gather(view: memoryview, offsets: list[int]) -> np.ndarray:
+    matrix = np.empty((len(offsets), FACE_EMBEDDING_DIM), dtype=np.float32)
+    for row, offset in enumerate(offsets):
+        matrix[row] = np.frombuffer(
+            view, dtype="<f4", count=FACE_EMBEDDING_DIM, offset=offset
+        )
+    return matrix
+
+
+def prepare_batch(roll_nos: list[str], embeddings, rejected: dict[str, str]) -> EnrollmentBatch:
+    """Validate dimensions and L2-normalise every vector in one NumPy pass."""
+    if isinstance(embeddings, np.ndarray):
+        matrix = embeddings.astype(np.float32, copy=False)
+        keep = np.ones(len(roll_nos), dtype=bool)
+    else:
+        keep = np.array(
+            [
+                isinstance(e, list) and len(e) == FACE_EMBEDDING_DIM
+                for e in embeddings
+            ],
+            dtype=bool,
+        )
+        for roll_no, ok in zip(roll_nos, keep):
+            if not ok:
+                rejected[roll_no] = "bad_dimension"
+        roll_nos = [r for r, ok in zip(roll_nos, keep) if ok]
+        rows = [e for e, ok in zip(embeddings, keep) if ok]
+        try:
+            matrix = np.array(rows, dtype=np.float32).reshape(-1, FACE_EMBEDDING_DIM)
+        except (TypeError, ValueError):
+            # Some row holds non-numbers: convert row by row, drop only those
+            matrix = np.empty((len(rows), FACE_EMBEDDING_DIM), dtype=np.float32)
+            numeric = np.ones(len(rows), dtype=bool)
+            for i, row in enumerate(rows):
+                try:
+                    matrix[i] = row
+                except (TypeError, ValueError):
+                    numeric[i] = False
+                    rejected[roll_nos[i]] = "malformed"
+            matrix = matrix[numeric]
+            roll_nos = [r for r, ok in zip(roll_nos, numeric) if ok]
+
+    norms = np.linalg.norm(matrix, axis=1)
+    valid = np.isfinite(norms) & (norms > 1e-6)
+    matrix = matrix[valid] / norms[valid, None]
+
+    for roll_no, ok in zip(roll_nos, valid):
+        if not ok:
+            rejected[roll_no] = "invalid_vector"
+    roll_nos = [r for r, ok in zip(roll_nos, valid) if ok]
+
+    # last occurrence of a roll wins (an upsert cannot touch a row twice)
+    latest = {roll_no: i for i, roll_no in enumerate(roll_nos)}
+    if len(latest) != len(roll_nos):
+        rows = sorted(latest.values())
+        roll_nos = [roll_nos[i] for i in rows]
+        matrix = matrix[rows]
+
+    return EnrollmentBatch(roll_nos=roll_nos, vectors=matrix, rejected=rejected)
+
+
+# Enrolment writes the student's face template (one per student, shared by
+# every room) and points the room's registry row at it.
+_UPSERT_FACES = text(
+    """
+    WITH batch AS (
+        SELECT r.id, r.template_id, r.roll_no, r.embedding, t.assigned_student_id AS student_id
+        FROM unnest(
+            CAST(:ids AS uuid[]),
+            CAST(:template_ids AS uuid[]),
+            CAST(:roll_nos AS text[]),
+            CAST(:embeddings AS jsonb[])
+        ) AS r(id, template_id, roll_no, embedding)
+        JOIN attendance_tokens t
+          ON t.room_id = :room_id
+         AND t.roll_no = r.roll_no
+         AND t.assigned_student_id IS NOT NULL
+    ), templates AS (
+        INSERT INTO face_templates (id, student_id, embedding)
+        SELECT DISTINCT ON (student_id) template_id, student_id, embedding
+        FROM batch
+        ORDER BY student_id
+        ON CONFLICT (student_id) DO UPDATE SET
+            embedding = EXCLUDED.embedding,
+            updated_at = now()
+        RETURNING id, student_id
+    )
+    INSERT INTO room_face_registry (id, room_id, student_id, roll_no, template_id)
+    SELECT b.id, :room_id, b.student_id, b.roll_no, tp.id
+    FROM batch b
+    JOIN templates tp ON tp.student_id = b.student_id
+    ON CONFLICT ON CONSTRAINT uq_room_roll_face DO UPDATE SET
+        student_id = EXCLUDED.student_id,
+        template_id = EXCLUDED.template_id,
+        created_at = now()
+    RETURNING roll_no, template_id
+    """
+).bindparams(
+    bindparam("room_id", type_=UUID(as_uuid=True)),
+    bindparam("ids", type_=ARRAY(String)),
+    bindparam("template_ids", type_=ARRAY(String)),
+    bindparam("roll_nos", type_=ARRAY(String)),
+    bindparam("embeddings", type_=ARRAY(String)),
+)
+
+
+def upsert_embeddings(
+    db: Session, room_id: uuid.UUID, batch: EnrollmentBatch
+) -> dict[str, uuid.UUID]:
+    """One set-based upsert for the whole batch; returns enrolled roll -> template id.
+
+    Only rolls a student has joined can be enrolled (student_id is required).
+    """
+    if not batch.roll_nos:
+        return {}
+
+    rows = db.execute(
+        _UPSERT_FACES,
+        {
+            "room_id": room_id,
+            "ids": [str(uuid.uuid4()) for _ in batch.roll_nos],
+            "template_ids": [str(uuid.uuid4()) for _ in batch.roll_nos],
+            "roll_nos": batch.roll_nos,
+            "embeddings": [json.dumps(v) for v in batch.vectors.tolist()],
+        },
+    ).all()
+    return {row.roll_no: uuid.UUID(str(row.template_id)) for row in rows}
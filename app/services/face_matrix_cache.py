@@ -0,0 +1,234 @@
+# app/services/face_matrix_cache.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.face_template_models import FaceTemplate
+from app.models.room_face_registry_models import RoomFaceRegistry
+from app.services.embedding_store import dequantize, embedding_store
+from app.services.face_embeddings import FACE_EMBEDDING_DIM
+
+FACE_MATRIX_CACHE_ROOMS = int(os.getenv("FACE_MATRIX_CACHE_ROOMS", "64"))
+FACE_TEMPLATE_CACHE_SIZE = int(os.getenv("FACE_TEMPLATE_CACHE_SIZE", "50000"))
+
+
+@dataclass(frozen=True)
+class RoomFaceMatrix:
+    roll_nos: list[str]
+    student_ids: list[uuid.UUID]
+    template_ids: list[uuid.UUID]
+    matrix: np.ndarray  # (n, FACE_EMBEDDING_DIM) float32 rows L2-normalised, or int8
+    # Embedding store version when served from disk, else the registry version
+    version: str | None = None
+    scales: np.ndarray | None = None  # set when matrix is the int8 store variant
+
+    def vectors(self, rows) -> np.ndarray:
+        """float32, L2-normalised copies of the given rows (dequantised if int8)."""
+        return dequantize(
+            self.matrix[rows], None if self.scales is None else self.scales[rows]
+        )
+
+
+class FaceTemplateCache:
+    """Per-process LRU of template vectors, shared by every room.
+
+    A student enrolled in several rooms is decoded and held once. Entries are
+    keyed by template id and checked against ``updated_at``, so a template
+    re-enrolled through another worker is never served stale.
+    """
+
+    def __init__(self, max_templates: int = FACE_TEMPLATE_CACHE_SIZE):
+        self._max_templates = max_templates
+        self._vectors: OrderedDict[uuid.UUID, tuple[datetime, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(
+        self, db: Session, versions: list[tuple[uuid.UUID, datetime]]
+    ) -> np.ndarray:
+        found: dict[uuid.UUID, np.ndarray] = {}
+        with self._lock:
+            for template_id, updated_at in versions:
+                cached = self._vectors.get(template_id)
+                if cached is not None and cached[0] == updated_at:
+                    self._vectors.move_to_end(template_id)
+                    found[template_id] = cached[1]
+
+        missing = [t for t, _ in versions if t not in found]
+        if missing:
+            rows = (
+                db.query(FaceTemplate.id, FaceTemplate.updated_at, FaceTemplate.embedding)
+                .filter(FaceTemplate.id.in_(missing))
+                .all()
+            )
+            with self._lock:
+                for row in rows:
+                    vector = np.asarray(row.embedding, dtype=np.float32)
+                    vector.flags.writeable = False
+                    found[row.id] = vector
+                    self._vectors[row.id] = (row.updated_at, vector)
+                    self._vectors.move_to_end(row.id)
+                while len(self._vectors) > self._max_templates:
+                    self._vectors.popitem(last=False)
+
+        matrix = np.empty((len(versions), FACE_EMBEDDING_DIM), dtype=np.float32)
+        for row, (template_id, _) in enumerate(versions):
+            matrix[row] = found[template_id]
+        return matrix
+
+    def discard(self, template_ids: list[uuid.UUID]) -> None:
+        with self._lock:
+            for template_id in template_ids:
+                self._vectors.pop(template_id, None)
+
+
+def registry_version(db: Session, room_id: uuid.UUID) -> str:
+    """Cheap fingerprint of a room's registry: one indexed aggregate, no vectors.
+
+    Any enrolment (new row or re-enrolled template) moves the max timestamp and
+    any removal moves the count, so it changes whenever the matrix would.
+    """
+    count, latest = (
+        db.query(
+            func.count(RoomFaceRegistry.id),
+            func.max(func.greatest(RoomFaceRegistry.created_at, FaceTemplate.updated_at)),
+        )
+        .join(FaceTemplate, FaceTemplate.id == RoomFaceRegistry.template_id)
+        .filter(RoomFaceRegistry.room_id == room_id)
+        .one()
+    )
+    return f"{count}:{latest.isoformat() if latest else ''}"
+
+
+def load_room_matrix(
+    db: Session, room_id: uuid.UUID, templates: FaceTemplateCache
+) -> RoomFaceMatrix:
+    rows = (
+        db.query(
+            RoomFaceRegistry.roll_no,
+            RoomFaceRegistry.student_id,
+            RoomFaceRegistry.template_id,
+            FaceTemplate.updated_at,
+        )
+        .join(FaceTemplate, FaceTemplate.id == RoomFaceRegistry.template_id)
+        .filter(RoomFaceRegistry.room_id == room_id)
+        .order_by(RoomFaceRegistry.roll_no)
+        .all()
+    )
+    return RoomFaceMatrix(
+        roll_nos=[row.roll_no for row in rows],
+        student_ids=[row.student_id for row in rows],
+        template_ids=[row.template_id for row in rows],
+        matrix=templates.get_many(db, [(row.template_id, row.updated_at) for row in rows]),
+    )
+
+
+class RoomFaceMatrixCache:
+    """Per-process LRU of room embedding matrices.
+
+    Entries are immutable and rebuilt from the shared template cache, so
+    refreshing a room only fetches the templates that actually changed.
+    """
+
+    def __init__(self, max_rooms: int = FACE_MATRIX_CACHE_ROOMS):
+        self._max_rooms = max_rooms
+        self._rooms: OrderedDict[uuid.UUID, RoomFaceMatrix] = OrderedDict()
+        self._lock = threading.Lock()
+        self.templates = FaceTemplateCache()
+
+    def get(self, db: Session, room_id: uuid.UUID) -> RoomFaceMatrix:
+        # An entry is only fresh while it matches the published store version,
+        # or without a store the registry version: another worker may have
+        # enrolled faces into the room since it was cached.
+        if embedding_store is not None:
+            version = embedding_store.current_version(room_id)
+        else:
+            version = registry_version(db, room_id)
+
+        with self._lock:
+            entry = self._rooms.get(room_id)
+            if entry is not None and entry.version == version:
+                self._rooms.move_to_end(room_id)
+                return entry
+
+        if embedding_store is None:
+            entry = replace(load_room_matrix(db, room_id, self.templates), version=version)
+        else:
+            entry = self._from_store(room_id) if version is not None else None
+            if entry is None:
+                entry = self._publish(db, room_id)
+
+        with self._lock:
+            self._rooms[room_id] = entry
+            self._rooms.move_to_end(room_id)
+            while len(self._rooms) > self._max_rooms:
+                self._rooms.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _from_store(room_id: uuid.UUID) -> RoomFaceMatrix | None:
+        stored = embedding_store.open(room_id)
+        if stored is None:
+            return None
+        return RoomFaceMatrix(
+            roll_nos=stored.roll_nos,
+            student_ids=stored.student_ids,
+            template_ids=stored.template_ids,
+            matrix=stored.matrix,
+            version=stored.version,
+            scales=stored.scales,
+        )
+
+    def _publish(self, db: Session, room_id: uuid.UUID) -> RoomFaceMatrix:
+        # Taken before the read: a rebuild that saw an older registry always
+        # gets the smaller version, even if it publishes last
+        as_of_ns = time.time_ns()
+        entry = load_room_matrix(db, room_id, self.templates)
+        embedding_store.publish(
+            room_id,
+            entry.roll_nos,
+            entry.student_ids,
+            entry.template_ids,
+            entry.matrix,
+            as_of_ns=as_of_ns,
+        )
+        # If the store cannot be read back (pruned by a racing publisher), serve
+        # the in-heap matrix; version None makes the next get() try again
+        return self._from_store(room_id) or entry
+
+    def registry_changed(self, db: Session, template_ids: list[uuid.UUID]) -> None:
+        """Refresh after face templates were (re-)enrolled.
+
+        A template is shared by every room its student is enrolled in, so all
+        of those rooms are refreshed, not just the one the batch came through.
+        """
+        if not template_ids:
+            return
+        self.templates.discard(template_ids)
+
+        room_ids = [
+            room_id
+            for (room_id,) in db.query(RoomFaceRegistry.room_id)
+            .filter(RoomFaceRegistry.template_id.in_(template_ids))
+            .distinct()
+            .all()
+        ]
+        for room_id in room_ids:
+            self.invalidate(room_id)
+            # Publish a new on-disk version; every worker picks it up on next get()
+            if embedding_store is not None:
+                self._publish(db, room_id)
+
+    def invalidate(self, room_id: uuid.UUID) -> None:
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+
+face_matrix_cache = RoomFaceMatrixCache()
@@ -0,0 +1,288 @@
+# app/services/idempotency.py
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import SessionLocal
+from app.models.idempotency_models import IdempotencyKey
+from app.services.deadlines import without_deadline
+from app.utils.jwt import SECRET_KEY
+
+# Retried writes carrying an Idempotency-Key replay the first response instead
+# of running again. Completed responses are kept in a bounded in-process LRU
+# (absorbs retry storms without a DB round trip) and in idempotency_keys, so a
+# retry that lands on another worker replays too.
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+# Sign-in is deliberately not listed. Re-running it is already safe (one
+# upsert replaces the user's single session), and the fresh run returns tokens
+# for the session that is now current. A replay could return tokens whose
+# session a later sign-in or refresh has replaced, or that have expired.
+IDEMPOTENT_ROUTES = {
+    "/api/v1/room/join",
+    "/api/v1/room/provide-token",
+    "/api/v1/room/provide-fingerprint-token",
+}
+
+# Transient outcomes are not recorded; the retry runs the request again
+_NOT_RECORDED = {409, 429}
+_PURGE_BATCH = 100
+
+_SERVER_KEY = os.getenv("IDEMPOTENCY_KEY_SECRET", SECRET_KEY).encode()
+_NONCE_BYTES = 12
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: bytes
+    media_type: str | None
+
+
+def derive_keys(key: str, request: Request, body: bytes) -> tuple[bytes, bytes]:
+    """(lookup hash, AES-256-GCM key) for a request's Idempotency-Key.
+
+    The scope covers the route, the caller (Authorization header) and the
+    payload, so a key reused by another user or for another body never replays.
+    """
+    scope = b"|".join(
+        [
+            request.method.encode(),
+            request.url.path.encode(),
+            request.headers.get("authorization", "").encode(),
+            hashlib.sha256(body).digest(),
+            key.encode(),
+        ]
+    )
+    key_hash = hmac.new(_SERVER_KEY, b"lookup:" + scope, hashlib.sha256).digest()
+    secret = hmac.new(_SERVER_KEY, b"seal:" + scope, hashlib.sha256).digest()
+    return key_hash, secret
+
+
+# Stored bodies contain one-time tokens; they are sealed with AES-GCM under a
+# key only derivable together with the client's key, bound to the row's hash.
+def seal(secret: bytes, key_hash: bytes, body: bytes) -> bytes:
+    nonce = secrets.token_bytes(_NONCE_BYTES)
+    return nonce + AESGCM(secret).encrypt(nonce, body, key_hash)
+
+
+def unseal(secret: bytes, key_hash: bytes, blob: bytes) -> bytes | None:
+    nonce, cipher = blob[:_NONCE_BYTES], blob[_NONCE_BYTES:]
+    try:
+        return AESGCM(secret).decrypt(nonce, cipher, key_hash)
+    except (InvalidTag, ValueError):
+        return None
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_CACHE_SIZE,
+        ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS,
+        lease_seconds: int = IDEMPOTENCY_LEASE_SECONDS,
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._lease = lease_seconds
+        self._local: OrderedDict[bytes, tuple[float, StoredResponse]] = OrderedDict()
+        self._running: set[bytes] = set()
+        self._lock = threading.Lock()
+
+    def _remember(self, key_hash: bytes, stored: StoredResponse, ttl: float) -> None:
+        with self._lock:
+            self._local[key_hash] = (time.monotonic() + ttl, stored)
+            self._local.move_to_end(key_hash)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def begin(self, key_hash: bytes, secret: bytes) -> tuple[bool, StoredResponse | None]:
+        """Claim a key. Returns (claimed, stored response to replay)."""
+        with self._lock:
+            cached = self._local.get(key_hash)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._local.move_to_end(key_hash)
+                    return False, cached[1]
+                del self._local[key_hash]
+            if key_hash in self._running:
+                return False, None
+            self._running.add(key_hash)
+
+        try:
+            claimed, stored = self._claim(key_hash, secret)
+        except Exception:
+            self._forget_running(key_hash)
+            raise
+        if not claimed:
+            self._forget_running(key_hash)
+        return claimed, stored
+
+    def _claim(self, key_hash: bytes, secret: bytes) -> tuple[bool, StoredResponse | None]:
+        # New keys and expired rows (finished or abandoned) are claimed with a
+        # short lease; anything else is either running or replayable.
+        stmt = insert(IdempotencyKey).values(
+            key_hash=key_hash,
+            expires_at=func.now() + timedelta(seconds=self._lease),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key_hash],
+            set_={
+                "status_code": None,
+                "response_body": None,
+                "media_type": None,
+                "created_at": func.now(),
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < func.now(),
+        ).returning(IdempotencyKey.key_hash)
+
+        with without_deadline(), SessionLocal() as db:
+            claimed = db.execute(stmt).first() is not None
+            db.commit()
+            if claimed:
+                return True, None
+
+            row = db.execute(
+                select(
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.response_body,
+                    IdempotencyKey.media_type,
+                    IdempotencyKey.expires_at - func.now(),
+                ).where(IdempotencyKey.key_hash == key_hash)
+            ).first()
+
+        if row is None or row.status_code is None:
+            return False, None
+        body = unseal(secret, key_hash, row.response_body)
+        if body is None:
+            return False, None
+
+        stored = StoredResponse(row.status_code, body, row.media_type)
+        self._remember(key_hash, stored, min(row[3].total_seconds(), self._ttl))
+        return False, stored
+
+    def complete(self, key_hash: bytes, secret: bytes, stored: StoredResponse) -> None:
+        # Local first: even if the write below fails, this worker still replays
+        self._remember(key_hash, stored, self._ttl)
+        try:
+            with without_deadline(), SessionLocal() as db:
+                db.execute(
+                    update(IdempotencyKey)
+                    .where(IdempotencyKey.key_hash == key_hash)
+                    .values(
+                        status_code=stored.status_code,
+                        response_body=seal(secret, key_hash, stored.body),
+                        media_type=stored.media_type,
+                        expires_at=func.now() + timedelta(seconds=self._ttl),
+                    )
+                )
+                # Opportunistic, bounded cleanup of expired keys
+                expired = (
+                    select(IdempotencyKey.key_hash)
+                    .where(IdempotencyKey.expires_at < func.now())
+                    .limit(_PURGE_BATCH)
+                    .scalar_subquery()
+                )
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.key_hash.in_(expired)))
+                db.commit()
+        finally:
+            self._forget_running(key_hash)
+
+    def release(self, key_hash: bytes) -> None:
+        """Give up a claim so a retry runs the request again."""
+        try:
+            with without_deadline(), SessionLocal() as db:
+                db.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.key_hash == key_hash,
+                        IdempotencyKey.status_code.is_(None),
+                    )
+                )
+                db.commit()
+        finally:
+            self._forget_running(key_hash)
+
+    def _forget_running(self, key_hash: bytes) -> None:
+        with self._lock:
+            self._running.discard(key_hash)
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _replay(stored: StoredResponse) -> Response:
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type=stored.media_type,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def idempotency_middleware(request: Request, call_next):
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if (
+        key is None
+        or request.method != "POST"
+        or request.url.path not in IDEMPOTENT_ROUTES
+    ):
+        return await call_next(request)
+
+    if not key or len(key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+        return JSONResponse(
+            status_code=400, content={"detail": "Invalid Idempotency-Key"}
+        )
+
+    key_hash, secret = derive_keys(key, request, await request.body())
+    claimed, stored = await run_in_threadpool(idempotency_store.begin, key_hash, secret)
+    if stored is not None:
+        return _replay(stored)
+    if not claimed:
+        return JSONResponse(
+            status_code=409,
+            content={"detail": "A request with this Idempotency-Key is still in progress"},
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    except Exception:
+        await run_in_threadpool(idempotency_store.release, key_hash)
+        raise
+
+    if response.status_code >= 500 or response.status_code in _NOT_RECORDED:
+        await run_in_threadpool(idempotency_store.release, key_hash)
+    else:
+        await run_in_threadpool(
+            idempotency_store.complete,
+            key_hash,
+            secret,
+            StoredResponse(
+                response.status_code, body, response.headers.get("content-type")
+            ),
+        )
+
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+    )
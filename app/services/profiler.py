@@ -0,0 +1,172 @@
+# app/services/profiler.py
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+# Admin-triggered sampling profiler. A background thread snapshots every
+# thread's stack with sys._current_frames() at a fixed interval; nothing is
+# installed in the interpreter (no setprofile/settrace), so requests that are
+# not sampled pay nothing. Output is the collapsed-stack format read by
+# flamegraph.pl / speedscope: "route;frame;frame;... count" per line.
+# Each worker profiles itself only: the endpoint samples the worker that
+# happens to serve it.
+#
+# A stack is attributed to the route of its innermost frame that tells:
+#   - the endpoint function itself;
+#   - a threadpool call (sync dependencies, response validation): while a
+#     profile runs, profiler_middleware puts the route in a contextvar, which
+#     is read from the Context the worker thread is running;
+#   - on the event loop (body parsing, request validation, rendering): the
+#     matched route in the ASGI scope of FastAPI's / Starlette's handler.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MAX_DEPTH = 128
+
+# A thread whose innermost Python frame is in one of these is waiting for
+# work, not serving a request
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+UNATTRIBUTED = "[unattributed]"
+
+_ROUTING_FILES = (
+    os.path.join("fastapi", "routing.py"),
+    os.path.join("starlette", "routing.py"),
+)
+
+_route: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "profiled_route", default=None
+)
+
+# How a frame can name its route (per code object, decided once)
+_PLAIN, _ENDPOINT, _WORKER, _ROUTING = range(4)
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def route_label(route) -> str | None:
+    if not isinstance(route, APIRoute):
+        return None
+    return f"{','.join(sorted(route.methods))} {route.path}"
+
+
+def _frame_kind(code, routes: dict) -> int:
+    if code in routes:
+        return _ENDPOINT
+    names = code.co_varnames + code.co_cellvars + code.co_freevars
+    filename = code.co_filename
+    # anyio's WorkerThread.run: ``context.run(func, *args)`` for each call
+    if code.co_name == "run" and "anyio" in filename and "context" in names:
+        return _WORKER
+    if filename.endswith(_ROUTING_FILES) and ("scope" in names or "request" in names):
+        return _ROUTING
+    return _PLAIN
+
+
+def _route_from_frame(frame, kind: int, routes: dict) -> str | None:
+    if kind == _ENDPOINT:
+        return routes[frame.f_code]
+    f_locals = frame.f_locals
+    if kind == _WORKER:
+        context = f_locals.get("context")
+        return context.get(_route) if isinstance(context, contextvars.Context) else None
+    scope = f_locals.get("scope")
+    if not isinstance(scope, dict):
+        scope = getattr(f_locals.get("request"), "scope", None)
+    return route_label(scope.get("route")) if isinstance(scope, dict) else None
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._route_by_code: dict = {}
+        self.running = False
+
+    def _routes(self, app) -> dict:
+        if not self._route_by_code:
+            for route in app.routes:
+                code = getattr(getattr(route, "endpoint", None), "__code__", None)
+                label = route_label(route)
+                if code is not None and label is not None:
+                    self._route_by_code[code] = label
+        return self._route_by_code
+
+    def run(self, app, seconds: float, interval: float) -> tuple[Counter, int]:
+        """Sample for `seconds`, blocking the calling thread. Returns (stacks, ticks)."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        self.running = True
+        try:
+            return self._sample(self._routes(app), seconds, interval)
+        finally:
+            self.running = False
+            self._lock.release()
+
+    @staticmethod
+    def _sample(routes: dict, seconds: float, interval: float) -> tuple[Counter, int]:
+        me = threading.get_ident()
+        labels: dict = {}  # code object -> "func (file:line)" frame label
+        kinds: dict = {}  # code object -> _PLAIN / _ENDPOINT / _WORKER / _ROUTING
+        stacks: Counter = Counter()
+        ticks = 0
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            ticks += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+
+                frames = []
+                route = None
+                while frame is not None and len(frames) < PROFILE_MAX_DEPTH:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = (
+                            f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                            f":{code.co_firstlineno})"
+                        )
+                        kinds[code] = _frame_kind(code, routes)
+                    if route is None and kinds[code] != _PLAIN:
+                        route = _route_from_frame(frame, kinds[code], routes)
+                    frames.append(label)
+                    frame = frame.f_back
+                frames.append(route or UNATTRIBUTED)
+                stacks[";".join(reversed(frames))] += 1
+            del frame
+            time.sleep(interval)
+
+        return stacks, ticks
+
+
+profiler = SamplingProfiler()
+
+
+async def profiler_middleware(request: Request, call_next):
+    # Only while a profile runs: name the route for threadpool calls
+    if not profiler.running:
+        return await call_next(request)
+
+    label = None
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            label = route_label(route)
+            break
+    token = _route.set(label)
+    try:
+        return await call_next(request)
+    finally:
+        _route.reset(token)
+
+
+def collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,242 @@
+# app/services/rate_limit.py
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+
+from app.utils.jwt import ALGORITHM, SECRET_KEY
+
+# In-process throttling (per worker). Middleware runs on the event loop only,
+# so the structures below need no locks.
+
+
+def _limit(name: str, default: str) -> tuple[float, float]:
+    """``"<burst>/<seconds>"``: a bucket of ``burst`` tokens refilled over ``seconds``."""
+    burst, seconds = os.getenv(name, default).split("/")
+    return float(burst), float(burst) / float(seconds)
+
+
+SIGN_IN_PER_IP = _limit("RATE_LIMIT_SIGN_IN_PER_IP", "30/60")
+SIGN_IN_PER_ACCOUNT = _limit("RATE_LIMIT_SIGN_IN_PER_ACCOUNT", "5/60")
+# A whole class can sit behind one campus NAT address
+JOIN_PER_IP = _limit("RATE_LIMIT_JOIN_PER_IP", "600/60")
+JOIN_PER_ACCOUNT = _limit("RATE_LIMIT_JOIN_PER_ACCOUNT", "10/60")
+JOIN_PER_ROOM = _limit("RATE_LIMIT_JOIN_PER_ROOM", "300/10")
+
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+
+# Join admission: a few joins per room run at once, a bounded queue waits
+JOIN_CONCURRENCY_PER_ROOM = int(os.getenv("JOIN_CONCURRENCY_PER_ROOM", "4"))
+JOIN_QUEUE_PER_ROOM = int(os.getenv("JOIN_QUEUE_PER_ROOM", "64"))
+JOIN_QUEUE_TIMEOUT_SECONDS = float(os.getenv("JOIN_QUEUE_TIMEOUT_SECONDS", "2"))
+
+SIGN_IN_PATHS = {"/api/v1/student/sign_in", "/api/v1/teacher/sign_in"}
+JOIN_PATH = "/api/v1/room/join"
+
+
+@dataclass
+class TokenBucket:
+    burst: float
+    rate: float  # tokens per second
+    tokens: float
+    updated: float
+
+    def take(self, now: float) -> float:
+        """Consume one token; returns 0, or the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def _take(self, key: str, limit: tuple[float, float], now: float) -> float:
+        burst, rate = limit
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(burst, rate, burst, now)
+            self._buckets[key] = bucket
+        self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+    def check(
+        self,
+        limits: list[tuple[str, tuple[float, float]]],
+        shared: list[tuple[str, tuple[float, float]]] | None = None,
+    ) -> float:
+        """Charge the (key, limit) pairs; returns the longest wait, 0 if allowed.
+
+        A request is charged to all of its per-client ``limits`` even when one
+        of them rejects it, so a client that keeps retrying stays throttled.
+        ``shared`` buckets (a whole room) are only charged once those admit:
+        one client's rejected retries must not use up everybody else's budget.
+        """
+        now = time.monotonic()
+        wait = 0.0
+        for key, limit in limits:
+            wait = max(wait, self._take(key, limit, now))
+        if not wait:
+            for key, limit in shared or []:
+                wait = max(wait, self._take(key, limit, now))
+
+        # Evicted buckets were idle longest; they would be (nearly) full anyway
+        while len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+@dataclass
+class _Room:
+    active: int = 0
+    waiters: deque = field(default_factory=deque)
+
+
+class AdmissionQueue:
+    """Per-key concurrency limit with a bounded FIFO of waiters.
+
+    Releasing hands the slot straight to the oldest waiter, so queued joins
+    keep their order and the active count never overshoots.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = JOIN_CONCURRENCY_PER_ROOM,
+        max_waiting: int = JOIN_QUEUE_PER_ROOM,
+        timeout: float = JOIN_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self._concurrency = concurrency
+        self._max_waiting = max_waiting
+        self._timeout = timeout
+        self._rooms: dict[str, _Room] = {}
+
+    async def acquire(self, key: str) -> bool:
+        room = self._rooms.setdefault(key, _Room())
+        if room.active < self._concurrency and not room.waiters:
+            room.active += 1
+            return True
+        if len(room.waiters) >= self._max_waiting:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        room.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self._timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return True  # handed a slot just as the timeout fired
+            if waiter in room.waiters:
+                room.waiters.remove(waiter)
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(key)  # handed a slot nobody will use: pass it on
+            elif waiter in room.waiters:
+                room.waiters.remove(waiter)
+            raise
+
+    def release(self, key: str) -> None:
+        room = self._rooms[key]
+        while room.waiters:
+            waiter = room.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes on, active is unchanged
+                return
+        room.active -= 1
+        if room.active == 0:
+            del self._rooms[key]
+
+
+rate_limiter = RateLimiter()
+join_admission = AdmissionQueue()
+
+
+def _too_many(wait: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests. Please retry shortly."},
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
+
+
+def _client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _field(body: bytes, name: str) -> str:
+    try:
+        value = json.loads(body).get(name)
+    except (ValueError, AttributeError):
+        return ""
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _account(request: Request, ip: str) -> str:
+    # The verified subject, so one account can't dodge its limit by signing
+    # in again. Without a valid token the caller is only known by address.
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    try:
+        subject = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        subject = None
+    return f"sub:{subject}" if subject and scheme.lower() == "bearer" else f"ip:{ip}"
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    path = request.url.path
+    if request.method != "POST" or (path not in SIGN_IN_PATHS and path != JOIN_PATH):
+        return await call_next(request)
+
+    ip = _client_ip(request)
+    body = await request.body()
+
+    shared = None
+    if path in SIGN_IN_PATHS:
+        limits = [
+            (f"sign_in:ip:{ip}", SIGN_IN_PER_IP),
+            (f"sign_in:account:{path}:{_field(body, 'email')}", SIGN_IN_PER_ACCOUNT),
+        ]
+    else:
+        limits = [
+            (f"join:ip:{ip}", JOIN_PER_IP),
+            (f"join:account:{_account(request, ip)}", JOIN_PER_ACCOUNT),
+        ]
+        shared = [(f"join:room:{_field(body, 'room_code')}", JOIN_PER_ROOM)]
+
+    wait = rate_limiter.check(limits, shared)
+    if wait:
+        return _too_many(wait)
+    return await call_next(request)
+
+
+async def join_admission_middleware(request: Request, call_next):
+    if request.method != "POST" or request.url.path != JOIN_PATH:
+        return await call_next(request)
+
+    # Bounded per-room queue: row locks on one room pile up behind each other,
+    # so excess joins are shed early instead of timing out for everyone
+    room = _field(await request.body(), "room_code")
+    if not await join_admission.acquire(room):
+        return _too_many(JOIN_QUEUE_TIMEOUT_SECONDS)
+    try:
+        return await call_next(request)
+    finally:
+        join_admission.release(room)
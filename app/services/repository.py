@@ -0,0 +1,60 @@
+# app/services/repository.py
+import uuid
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from app.models.attendance_token_models import AttendanceToken
+from app.models.room_models import Room
+from app.models.session_models import Session as UserSession
+from app.models.student_models import Student
+from app.models.teacher_models import Teacher
+
+# The hot lookups, built once at import with bound parameters. Executing the
+# same statement object skips query construction and lets SQLAlchemy reuse the
+# compiled form from the engine's statement cache straight away.
+# (psycopg2 has no server-side prepared statements; the saving is in Python.)
+
+_ROOM_BY_CODE = select(Room).where(Room.room_code == bindparam("room_code")).limit(1)
+
+_TOKEN_BY_ROLL = select(AttendanceToken).where(
+    AttendanceToken.room_id == bindparam("room_id"),
+    AttendanceToken.roll_no == bindparam("roll_no"),
+).limit(1)
+_TOKEN_BY_ROLL_FOR_UPDATE = _TOKEN_BY_ROLL.with_for_update()
+
+_SESSION_EXISTS = select(UserSession.id).where(
+    UserSession.id == bindparam("session_id"),
+    UserSession.user_id == bindparam("user_id"),
+).limit(1)
+
+_TEACHER_BY_ID = select(Teacher).where(Teacher.id == bindparam("user_id")).limit(1)
+_STUDENT_BY_ID = select(Student).where(Student.id == bindparam("user_id")).limit(1)
+
+
+def room_by_code(db: Session, room_code: str) -> Room | None:
+    return db.execute(_ROOM_BY_CODE, {"room_code": room_code}).scalars().first()
+
+
+def token_by_roll(
+    db: Session, room_id: uuid.UUID, roll_no: str, for_update: bool = False
+) -> AttendanceToken | None:
+    statement = _TOKEN_BY_ROLL_FOR_UPDATE if for_update else _TOKEN_BY_ROLL
+    return db.execute(statement, {"room_id": room_id, "roll_no": roll_no}).scalars().first()
+
+
+def session_exists(db: Session, session_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    return (
+        db.execute(
+            _SESSION_EXISTS, {"session_id": session_id, "user_id": user_id}
+        ).first()
+        is not None
+    )
+
+
+def teacher_by_id(db: Session, teacher_id: uuid.UUID) -> Teacher | None:
+    return db.execute(_TEACHER_BY_ID, {"user_id": teacher_id}).scalars().first()
+
+
+def student_by_id(db: Session, student_id: uuid.UUID) -> Student | None:
+    return db.execute(_STUDENT_BY_ID, {"user_id": student_id}).scalars().first()
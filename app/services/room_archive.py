@@ -0,0 +1,119 @@
+# app/services/room_archive.py
+import uuid
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from app.models.attendance_token_models import AttendanceToken
+from app.models.room_models import Room
+from app.services.embedding_store import embedding_store
+from app.services.face_matrix_cache import face_matrix_cache
+from app.services.rooms_version import (
+    bump_student_rooms_version,
+    bump_teacher_rooms_version,
+)
+
+# Rows moved / deleted per transaction: keeps locks, WAL bursts and memory bounded
+ARCHIVE_CHUNK_SIZE = 2000
+
+_ARCHIVE_ROOM = text(
+    """
+    INSERT INTO archived_rooms (id, room_code, room_name, teacher_id, capacity, created_at)
+    SELECT id, room_code, room_name, teacher_id, capacity, created_at
+    FROM rooms WHERE id = :room_id
+    ON CONFLICT (id) DO NOTHING
+    """
+).bindparams(bindparam("room_id", type_=UUID(as_uuid=True)))
+
+_MOVE_TOKENS_CHUNK = text(
+    """
+    WITH moved AS (
+        DELETE FROM attendance_tokens
+        WHERE room_id = :room_id AND id IN (
+            SELECT id FROM attendance_tokens WHERE room_id = :room_id LIMIT :chunk_size
+        )
+        RETURNING room_id, roll_no, assigned_student_id, used
+    ), archived AS (
+        INSERT INTO archived_attendance_tokens (room_id, roll_no, assigned_student_id, used)
+        SELECT room_id, roll_no, assigned_student_id, coalesce(used, false) FROM moved
+        ON CONFLICT (room_id, roll_no) DO NOTHING
+    )
+    SELECT count(*) FROM moved
+    """
+).bindparams(bindparam("room_id", type_=UUID(as_uuid=True)))
+
+_DELETE_CHUNK = """
+    DELETE FROM {table}
+    WHERE room_id = :room_id AND id IN (
+        SELECT id FROM {table} WHERE room_id = :room_id LIMIT :chunk_size
+    )
+"""
+
+
+def _delete_in_chunks(db: Session, table: str, room_id: uuid.UUID) -> int:
+    statement = text(_DELETE_CHUNK.format(table=table)).bindparams(
+        bindparam("room_id", type_=UUID(as_uuid=True))
+    )
+    total = 0
+    while True:
+        deleted = db.execute(
+            statement, {"room_id": room_id, "chunk_size": ARCHIVE_CHUNK_SIZE}
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < ARCHIVE_CHUNK_SIZE:
+            return total
+
+
+def remove_room(db: Session, room_id: uuid.UUID, archive: bool = True) -> int:
+    """Archive (or drop) a room's tokens in bounded chunks, then delete the room.
+
+    Each chunk commits on its own, so an interrupted run can simply be repeated.
+    Returns the number of attendance tokens moved or deleted.
+    """
+    # Room lists change for the owner and every joined student; their
+    # versions are bumped together with the final room delete
+    teacher_id = db.query(Room.teacher_id).filter(Room.id == room_id).scalar()
+    student_ids = [
+        student_id
+        for (student_id,) in db.query(AttendanceToken.assigned_student_id)
+        .filter(
+            AttendanceToken.room_id == room_id,
+            AttendanceToken.assigned_student_id.isnot(None),
+        )
+        .distinct()
+    ]
+
+    if archive:
+        db.execute(_ARCHIVE_ROOM, {"room_id": room_id})
+        db.commit()
+
+        moved = 0
+        while True:
+            chunk = db.execute(
+                _MOVE_TOKENS_CHUNK,
+                {"room_id": room_id, "chunk_size": ARCHIVE_CHUNK_SIZE},
+            ).scalar_one()
+            db.commit()
+            moved += chunk
+            if chunk < ARCHIVE_CHUNK_SIZE:
+                break
+    else:
+        moved = _delete_in_chunks(db, "attendance_tokens", room_id)
+
+    # Other large per-room tables, then the room itself (small cascades only)
+    _delete_in_chunks(db, "attendance_records", room_id)
+    _delete_in_chunks(db, "room_face_registry", room_id)
+
+    db.query(Room).filter(Room.id == room_id).delete(synchronize_session=False)
+    if teacher_id is not None:
+        bump_teacher_rooms_version(db, teacher_id)
+    bump_student_rooms_version(db, student_ids)
+    db.commit()
+
+    face_matrix_cache.invalidate(room_id)
+    if embedding_store is not None:
+        embedding_store.remove(room_id)
+
+    return moved
@@ -0,0 +1,39 @@
+# app/services/room_stats.py
+import uuid
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.models.room_stats_models import RoomAttendanceStats
+
+
+def init_room_stats(db: Session, room_id: uuid.UUID, capacity: int) -> None:
+    # Every roll starts unjoined with an outstanding fingerprint token
+    db.add(
+        RoomAttendanceStats(
+            room_id=room_id,
+            joined_count=0,
+            unjoined_count=capacity,
+            tokens_reissued=0,
+            fingerprint_outstanding=capacity,
+        )
+    )
+
+
+def bump_room_stats(db: Session, room_id: uuid.UUID, **deltas: int) -> None:
+    # Relative update in the caller's transaction; call it last, right before
+    # commit, so the counter row lock is held as briefly as possible.
+    values = {
+        name: getattr(RoomAttendanceStats, name) + delta
+        for name, delta in deltas.items()
+        if delta
+    }
+    if not values:
+        return
+
+    db.execute(
+        update(RoomAttendanceStats)
+        .where(RoomAttendanceStats.room_id == room_id)
+        .values(**values, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
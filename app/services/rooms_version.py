@@ -0,0 +1,46 @@
+# app/services/rooms_version.py
+import uuid
+from typing import Iterable
+
+from fastapi import Request
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.student_models import Student
+from app.models.teacher_models import Teacher
+
+
+def bump_teacher_rooms_version(db: Session, teacher_id: uuid.UUID) -> None:
+    # In the caller's transaction, so the version never runs ahead of the data
+    db.execute(
+        update(Teacher)
+        .where(Teacher.id == teacher_id)
+        .values(rooms_version=Teacher.rooms_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_student_rooms_version(db: Session, student_ids: Iterable[uuid.UUID]) -> None:
+    student_ids = [s for s in student_ids if s is not None]
+    if not student_ids:
+        return
+    db.execute(
+        update(Student)
+        .where(Student.id.in_(student_ids))
+        .values(rooms_version=Student.rooms_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rooms_etag(user_id: uuid.UUID, version: int, *variant) -> str:
+    parts = [user_id.hex, str(version), *(str(v) for v in variant)]
+    return '"' + "-".join(parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
@@ -0,0 +1,187 @@
+# app/services/token_audit.py
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime, timezone
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine
+from app.models.token_audit_models import TokenAuditEvent
+from app.utils.jwt import hash_token
+
+logger = logging.getLogger(__name__)
+
+# Handlers only append to an in-process ring buffer (no DB round trip); a
+# background thread batch-inserts into token_audit_events. Memory is bounded:
+# when the database cannot keep up, the oldest buffered events are dropped
+# and counted, never the request.
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "50000"))
+AUDIT_FLUSH_BATCH = int(os.getenv("AUDIT_FLUSH_BATCH", "1000"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+AUDIT_PARTITION_MONTHS_AHEAD = 2
+_PARTITION_CHECK_SECONDS = 3600
+
+# Event names
+TOKEN_ISSUED = "token_issued"
+TOKEN_REISSUED = "token_reissued"
+FINGERPRINT_ISSUED = "fingerprint_issued"
+JOINED = "joined"
+
+
+def _month_start(day: date, months: int = 0) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_audit_partitions(connection, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD) -> None:
+    # Monthly partitions must exist before rows for that month arrive, or
+    # those rows land in the default partition and block creating it later
+    today = datetime.now(timezone.utc).date()
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS token_audit_events_{start:%Y_%m} "
+                f"PARTITION OF token_audit_events "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+
+
+class TokenAuditLog:
+    def __init__(
+        self,
+        buffer_size: int = AUDIT_BUFFER_SIZE,
+        batch_size: int = AUDIT_FLUSH_BATCH,
+        interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+    ):
+        self._buffer: deque[dict] = deque(maxlen=buffer_size)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._pending: list[dict] = []  # drained but not yet inserted
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._partitions_checked = 0.0
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.flush_failures = 0
+        self.high_watermark = 0
+        self.last_flush_ms = 0.0
+
+    def record(
+        self,
+        event: str,
+        room_id: uuid.UUID,
+        roll_no: str | None = None,
+        actor_id: uuid.UUID | None = None,
+        student_id: uuid.UUID | None = None,
+        token: str | None = None,
+    ) -> None:
+        row = {
+            "id": uuid.uuid4(),
+            "occurred_at": datetime.now(timezone.utc),
+            "event": event,
+            "room_id": room_id,
+            "roll_no": roll_no,
+            "actor_id": actor_id,
+            "student_id": student_id,
+            "token_hash": hash_token(token) if token else None,
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1  # deque drops the oldest on append
+            self._buffer.append(row)
+            self.enqueued += 1
+            depth = len(self._buffer)
+            self.high_watermark = max(self.high_watermark, depth)
+        if depth >= self._batch_size:
+            self._wake.set()
+
+    def record_many(self, event: str, room_id: uuid.UUID, rolls, tokens, actor_id=None) -> None:
+        for roll_no, token in zip(rolls, tokens):
+            self.record(event, room_id, roll_no=roll_no, actor_id=actor_id, token=token)
+
+    def start(self) -> None:
+        # Per worker, after fork: a thread started in a preloading master
+        # would not survive into the workers
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="token-audit-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            while self.flush() >= self._batch_size and not self._stopping.is_set():
+                pass
+        # Final drain on shutdown
+        while self.flush():
+            pass
+
+    def flush(self) -> int:
+        """Insert up to one batch; returns the number of rows written."""
+        with self._lock:
+            if not self._pending:
+                take = min(self._batch_size, len(self._buffer))
+                self._pending = [self._buffer.popleft() for _ in range(take)]
+            batch = self._pending
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            with engine.begin() as connection:
+                now = time.monotonic()
+                if now - self._partitions_checked > _PARTITION_CHECK_SECONDS:
+                    ensure_audit_partitions(connection)
+                    self._partitions_checked = now
+                connection.execute(insert(TokenAuditEvent), batch)
+        except SQLAlchemyError as exc:
+            # Kept in _pending and retried on the next tick; meanwhile new
+            # events keep going to the (bounded) ring buffer
+            self.flush_failures += 1
+            logger.warning("Token audit flush failed: %s", exc)
+            return 0
+
+        with self._lock:
+            self._pending = []
+            self.flushed += len(batch)
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        return len(batch)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "pending": len(self._pending),
+                "capacity": self._buffer.maxlen,
+                "high_watermark": self.high_watermark,
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "flush_failures": self.flush_failures,
+                "last_flush_ms": self.last_flush_ms,
+            }
+
+
+token_audit = TokenAuditLog()
@@ -0,0 +1,73 @@
+# app/services/warmup.py
+import logging
+import os
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import configure_mappers
+
+from app.database import SessionLocal, engine, replica_engine
+from app.services.repository import (
+    room_by_code,
+    session_exists,
+    student_by_id,
+    teacher_by_id,
+    token_by_roll,
+)
+from app.utils.security import pwd_context
+
+logger = logging.getLogger(__name__)
+
+# Connections opened per engine when a worker starts (capped by the pool size)
+WARM_POOL_CONNECTIONS = int(os.getenv("WARM_POOL_CONNECTIONS", "2"))
+
+_process_warmed = False
+
+
+def warm_process() -> None:
+    """CPU-only warm-up, no I/O: safe in a preloading master before fork.
+
+    Everything built here (mapper configuration, the bcrypt backend and its
+    self-test) is then shared copy-on-write by all workers.
+    """
+    global _process_warmed
+    if _process_warmed:
+        return
+    configure_mappers()
+    pwd_context.handler().get_backend()
+    _process_warmed = True
+
+
+def warm_pool() -> None:
+    """Per-worker warm-up: open pooled connections and compile hot statements.
+
+    A database that is down at startup must not stop the worker from booting;
+    connections are then opened lazily as before.
+    """
+    try:
+        for each in (engine, replica_engine):
+            if each is None:
+                continue
+            # Held together, so the pool really opens that many connections
+            connections = []
+            try:
+                for _ in range(min(WARM_POOL_CONNECTIONS, each.pool.size())):
+                    connections.append(each.connect())
+                    connections[-1].execute(text("SELECT 1"))
+            finally:
+                for connection in connections:
+                    connection.close()
+
+        # Each lookup shape runs once, so its compiled form is in the engine's
+        # statement cache before the first real request needs it
+        nobody = uuid.UUID(int=0)
+        with SessionLocal() as db:
+            session_exists(db, nobody, nobody)
+            teacher_by_id(db, nobody)
+            student_by_id(db, nobody)
+            room_by_code(db, "")
+            token_by_roll(db, nobody, "")
+            token_by_roll(db, nobody, "", for_update=True)
+    except OperationalError as exc:
+        logger.warning("Skipping connection pool warm-up: %s", exc)
@@ -1,9 +1,8 @@
 from datetime import datetime, timedelta
+import hashlib
 from jose import jwt
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from app import config  # noqa: F401  (loads .env)
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
 ALGORITHM = "HS256"
@@ -25,3 +24,8 @@ def create_refresh_token(data: dict):
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def hash_token(token: str) -> bytes:
+    # Fixed-size digest stored instead of the full JWT (see Session.refresh_hash)
+    return hashlib.sha256(token.encode()).digest()
@@ -0,0 +1,60 @@
+# app/utils/room_code.py
+import hashlib
+import hmac
+import os
+import string
+
+from app import config  # noqa: F401  (loads .env)
+
+ROOM_CODE_ALPHABET = string.ascii_uppercase + string.digits
+ROOM_CODE_LENGTH = 6
+
+# The code space (36^6) splits into two equal halves of 36^3, so a balanced
+# Feistel network over (left, right) permutes the whole space exactly.
+_HALF_SPACE = len(ROOM_CODE_ALPHABET) ** (ROOM_CODE_LENGTH // 2)
+ROOM_CODE_SPACE = _HALF_SPACE * _HALF_SPACE
+
+_ROUNDS = 4
+_KEY = os.getenv("ROOM_CODE_KEY", os.getenv("SECRET_KEY", "supersecret")).encode()
+
+
+def _round_function(round_no: int, value: int) -> int:
+    digest = hmac.new(
+        _KEY, round_no.to_bytes(1, "big") + value.to_bytes(4, "big"), hashlib.sha256
+    ).digest()
+    return int.from_bytes(digest[:8], "big") % _HALF_SPACE
+
+
+def permute(index: int) -> int:
+    """Map ``index`` to a pseudo-random position in the code space (bijective)."""
+    if not 0 <= index < ROOM_CODE_SPACE:
+        raise ValueError("Room code space exhausted")
+
+    left, right = divmod(index, _HALF_SPACE)
+    for round_no in range(_ROUNDS):
+        left, right = right, (left + _round_function(round_no, right)) % _HALF_SPACE
+    return left * _HALF_SPACE + right
+
+
+def unpermute(value: int) -> int:
+    """Inverse of :func:`permute`."""
+    if not 0 <= value < ROOM_CODE_SPACE:
+        raise ValueError("Value outside room code space")
+
+    left, right = divmod(value, _HALF_SPACE)
+    for round_no in reversed(range(_ROUNDS)):
+        left, right = (right - _round_function(round_no, left)) % _HALF_SPACE, left
+    return left * _HALF_SPACE + right
+
+
+def encode_room_code(value: int) -> str:
+    chars = []
+    for _ in range(ROOM_CODE_LENGTH):
+        value, digit = divmod(value, len(ROOM_CODE_ALPHABET))
+        chars.append(ROOM_CODE_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def room_code_for(sequence_value: int) -> str:
+    """Turn a ``room_code_seq`` value (starting at 1) into a unique room code."""
+    return encode_room_code(permute(sequence_value - 1))
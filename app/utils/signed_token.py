@@ -0,0 +1,111 @@
+# app/utils/signed_token.py
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+import uuid
+from typing import Iterable
+
+from app import config  # noqa: F401  (loads .env)
+
+# Attendance / fingerprint tokens are self-authenticating:
+#   base32( issued_at:uint32 | nonce:2 bytes | HMAC(room_key, kind|roll|issued_at|nonce)[:6] )
+# so their authenticity and age can be checked without touching the database.
+ATTENDANCE = b"A"
+FINGERPRINT = b"F"
+
+_MASTER_KEY = os.getenv(
+    "ATTENDANCE_TOKEN_KEY", os.getenv("SECRET_KEY", "supersecret")
+).encode()
+_NONCE_BYTES = 2
+_MAC_BYTES = 6
+_TOKEN_BYTES = 4 + _NONCE_BYTES + _MAC_BYTES
+
+TOKEN_MAX_AGE_SECONDS = int(os.getenv("ATTENDANCE_TOKEN_MAX_AGE_SECONDS", "0")) or None
+
+
+def room_key(room_id: uuid.UUID) -> bytes:
+    # Per-room key, so a teacher device can verify its room without the master key
+    return hmac.new(_MASTER_KEY, b"room:" + room_id.bytes, hashlib.sha256).digest()
+
+
+def _mac(key: bytes, kind: bytes, roll_no: str, header: bytes) -> bytes:
+    message = kind + roll_no.encode() + b"|" + header
+    return hmac.new(key, message, hashlib.sha256).digest()[:_MAC_BYTES]
+
+
+def _encode(raw: bytes) -> str:
+    return base64.b32encode(raw).decode().rstrip("=")
+
+
+def _decode(token: str) -> bytes | None:
+    padded = token.upper() + "=" * (-len(token) % 8)
+    try:
+        raw = base64.b32decode(padded)
+    except ValueError:
+        return None
+    return raw if len(raw) == _TOKEN_BYTES else None
+
+
+def _mint(key: bytes, kind: bytes, roll_no: str, issued_at: int) -> str:
+    header = issued_at.to_bytes(4, "big") + secrets.token_bytes(_NONCE_BYTES)
+    return _encode(header + _mac(key, kind, roll_no, header))
+
+
+def mint_token(
+    room_id: uuid.UUID, roll_no: str, kind: bytes = ATTENDANCE, issued_at: int | None = None
+) -> str:
+    issued_at = int(time.time()) if issued_at is None else issued_at
+    return _mint(room_key(room_id), kind, roll_no, issued_at)
+
+
+def mint_tokens(
+    room_id: uuid.UUID, roll_nos: Iterable[str], kind: bytes = ATTENDANCE
+) -> list[str]:
+    # Bulk variant for room creation: one key derivation and one timestamp per batch
+    key = room_key(room_id)
+    issued_at = int(time.time())
+    return [_mint(key, kind, roll_no, issued_at) for roll_no in roll_nos]
+
+
+def token_issued_at(token: str) -> int | None:
+    raw = _decode(token)
+    return int.from_bytes(raw[:4], "big") if raw else None
+
+
+def verify_token(
+    token: str,
+    roll_no: str,
+    kind: bytes = ATTENDANCE,
+    *,
+    room_id: uuid.UUID | None = None,
+    key: bytes | None = None,
+    max_age: int | None = TOKEN_MAX_AGE_SECONDS,
+    now: float | None = None,
+) -> bool:
+    """Check that ``token`` was minted for this room/roll/kind and is fresh enough.
+
+    Pass either ``room_id`` (server side) or the room's ``key`` (teacher device).
+    Revocation is not covered here: the database still decides whether the token
+    is the one currently issued for the roll.
+    """
+    raw = _decode(token)
+    if raw is None:
+        return False
+
+    header, mac = raw[: 4 + _NONCE_BYTES], raw[4 + _NONCE_BYTES :]
+    if key is None:
+        key = room_key(room_id)
+    if not hmac.compare_digest(mac, _mac(key, kind, roll_no, header)):
+        return False
+
+    if max_age is not None:
+        issued_at = int.from_bytes(header[:4], "big")
+        now = time.time() if now is None else now
+        # allow a minute of clock skew between the minting server and the verifier
+        if issued_at > now + 60 or now - issued_at > max_age:
+            return False
+
+    return True
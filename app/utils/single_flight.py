@@ -0,0 +1,69 @@
+# app/utils/single_flight.py
+import threading
+from typing import Any, Callable, Hashable
+
+# Concurrent identical calls (same group, same key) share one execution:
+# the first caller runs it, the others block until it finishes and receive
+# the same result or exception. Nothing is cached once the call returns.
+# Handlers run in the threadpool, so this is thread based.
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+        _groups[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.executed += 1
+            call.done.set()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+_groups: dict[str, SingleFlight] = {}
+
+
+def single_flight_stats() -> dict[str, dict[str, int]]:
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,143 @@
+# bench/embedding_store.py
+#   python bench/embedding_store.py [rooms] [students_per_room]
+#
+# Memory and match latency of the three ways a worker can hold room
+# embedding matrices: in-heap float32 (no EMBEDDING_STORE_DIR), memory-mapped
+# float32 and memory-mapped int8 (EMBEDDING_STORE_QUANTIZED=1). Each mode runs
+# in a fresh interpreter that loads every room, then scores a batch of probe
+# faces against each room the way the face routes read it (entry.vectors).
+# Heap matrices show up as anonymous RSS, private to each worker; mapped ones
+# as file RSS, shared through the page cache. Linux only, no database needed.
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, value in {
+    "user": "bench",
+    "password": "bench",
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+import numpy as np  # noqa: E402
+
+from app.services.embedding_store import EmbeddingStore  # noqa: E402
+from app.services.face_embeddings import FACE_EMBEDDING_DIM  # noqa: E402
+from app.services.face_matrix_cache import RoomFaceMatrix  # noqa: E402
+
+MODES = ("heap", "mmap-float32", "mmap-int8")
+PROBES = 32
+PASSES = 5
+
+
+def rss_mb() -> tuple[float, float]:
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon", "RssFile")):
+                name, value = line.split(":")
+                fields[name] = int(value.split()[0]) / 1024
+    return fields["RssAnon"], fields["RssFile"]
+
+
+def room_matrix(rng: np.random.Generator, n: int) -> np.ndarray:
+    matrix = rng.standard_normal((n, FACE_EMBEDDING_DIM)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def run(mode: str, rooms: int, students: int, root: str) -> None:
+    rng = np.random.default_rng(0)
+    room_ids = [uuid.UUID(int=i + 1) for i in range(rooms)]
+    anon_before, file_before = rss_mb()
+
+    entries = []
+    if mode == "heap":
+        # Per-room lists, as load_room_matrix builds them, so only the
+        # matrices differ from the mapped modes
+        for _ in room_ids:
+            ids = [uuid.uuid4() for _ in range(students)]
+            entries.append(
+                RoomFaceMatrix(
+                    roll_nos=[f"{i:04}" for i in range(students)],
+                    student_ids=ids,
+                    template_ids=list(ids),
+                    matrix=room_matrix(rng, students),
+                )
+            )
+    else:
+        store = EmbeddingStore(root)
+        for room_id in room_ids:
+            stored = store.open(room_id)
+            entries.append(
+                RoomFaceMatrix(
+                    roll_nos=stored.roll_nos,
+                    student_ids=stored.student_ids,
+                    template_ids=stored.template_ids,
+                    matrix=stored.matrix,
+                    version=stored.version,
+                    scales=stored.scales,
+                )
+            )
+
+    probes = room_matrix(rng, PROBES)
+    rows = list(range(students))
+    timings = []
+    for _ in range(PASSES):
+        for entry in entries:
+            started = time.perf_counter()
+            (entry.vectors(rows) @ probes.T).argmax(axis=0)
+            timings.append(time.perf_counter() - started)
+
+    anon, file = rss_mb()
+    timings_ms = np.array(timings) * 1000
+    print(
+        f"{mode:>12}: anon RSS +{anon - anon_before:.1f} MB, "
+        f"file RSS +{file - file_before:.1f} MB, match {PROBES} probes "
+        f"p50 {np.percentile(timings_ms, 50):.3f} ms, "
+        f"p99 {np.percentile(timings_ms, 99):.3f} ms per room"
+    )
+
+
+def publish(root: str, quantized: bool, rooms: int, students: int) -> None:
+    rng = np.random.default_rng(0)
+    store = EmbeddingStore(root, quantized=quantized)
+    roll_nos = [f"{i:04}" for i in range(students)]
+    ids = [uuid.UUID(int=i + 1) for i in range(students)]
+    for i in range(rooms):
+        matrix = room_matrix(rng, students)
+        store.publish(uuid.UUID(int=i + 1), roll_nos, ids, ids, matrix)
+
+
+def main(rooms: int, students: int) -> None:
+    print(
+        f"{rooms} rooms x {students} students, {FACE_EMBEDDING_DIM}-d "
+        f"({rooms * students * FACE_EMBEDDING_DIM * 4 / 2**20:.1f} MB as float32)"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = {
+            "heap": tmp,
+            "mmap-float32": os.path.join(tmp, "float32"),
+            "mmap-int8": os.path.join(tmp, "int8"),
+        }
+        publish(roots["mmap-float32"], False, rooms, students)
+        publish(roots["mmap-int8"], True, rooms, students)
+        # Fresh interpreters, so each mode starts from the same baseline
+        for mode in MODES:
+            args = ["--child", mode, str(rooms), str(students), roots[mode]]
+            subprocess.run([sys.executable, __file__, *args], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        run(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5])
+    else:
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+        )
@@ -0,0 +1,60 @@
+# bench/face_duplicates.py
+#   python bench/face_duplicates.py [embeddings] [threshold]
+#
+# Duplicate-face detection over one institution: 20k random 128-d
+# embeddings by default, with a few planted near-duplicates. Times the
+# tiled, threaded find_similar_pairs at the default limit and reports peak
+# RSS. No database is needed.
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from app.services.face_duplicates import (  # noqa: E402
+    DUPLICATE_BLOCK_SIZE,
+    DUPLICATE_FACE_THRESHOLD,
+    DUPLICATE_WORKERS,
+    find_similar_pairs,
+)
+from app.services.face_embeddings import FACE_EMBEDDING_DIM  # noqa: E402
+
+LIMIT = 500  # the endpoint's default
+PLANTED = 50
+
+
+def main(n: int, threshold: float) -> None:
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((n, FACE_EMBEDDING_DIM)).astype(np.float32)
+    # Same face enrolled twice, with a little noise
+    sources = rng.choice(n, PLANTED, replace=False)
+    targets = rng.choice(np.setdiff1d(np.arange(n), sources), PLANTED, replace=False)
+    matrix[targets] = matrix[sources] + 0.05 * rng.standard_normal(
+        (PLANTED, FACE_EMBEDDING_DIM)
+    ).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    for limit in (LIMIT, None):
+        started = time.perf_counter()
+        rows, cols, _ = find_similar_pairs(matrix, threshold=threshold, limit=limit)
+        elapsed = time.perf_counter() - started
+        found = {tuple(sorted(p)) for p in zip(rows.tolist(), cols.tolist())}
+        planted = sum(tuple(sorted(p)) in found for p in zip(sources.tolist(), targets.tolist()))
+        print(
+            f"n={n} threshold={threshold} limit={limit}: {elapsed:.2f} s, "
+            f"{len(rows)} pairs, {planted}/{PLANTED} planted found "
+            f"(block {DUPLICATE_BLOCK_SIZE}, {DUPLICATE_WORKERS} workers)"
+        )
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else DUPLICATE_FACE_THRESHOLD,
+    )
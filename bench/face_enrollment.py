@@ -0,0 +1,164 @@
+# bench/face_enrollment.py
+#   python bench/face_enrollment.py [students]
+#   BENCH_DATABASE_URL=postgresql+psycopg2://... python bench/face_enrollment.py
+#
+# Bulk face enrolment of one class (1,000 students by default) in both wire
+# formats: parse, prepare (validate + L2-normalise) and, when
+# BENCH_DATABASE_URL points at a scratch Postgres database, the set-based
+# upsert into face_templates / room_face_registry (tables are created and
+# dropped there). Without a database only the in-process stages are timed.
+import json
+import os
+import struct
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, value in {
+    "user": "bench",
+    "password": "bench",
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+import numpy as np  # noqa: E402
+
+from app.services.face_embeddings import (  # noqa: E402
+    FACE_EMBEDDING_DIM,
+    parse_binary_batch,
+    parse_ndjson_batch,
+    prepare_batch,
+    upsert_embeddings,
+)
+
+ROUNDS = 5
+
+
+def make_bodies(students: int) -> tuple[list[str], bytes, bytes]:
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((students, FACE_EMBEDDING_DIM)).astype(np.float32)
+    roll_nos = [f"{i:04}" for i in range(1, students + 1)]
+    ndjson = "\n".join(
+        json.dumps({"roll_no": roll, "embedding": vector.tolist()})
+        for roll, vector in zip(roll_nos, vectors)
+    ).encode()
+    binary = b"".join(
+        struct.pack("<H", len(roll)) + roll.encode() + vector.astype("<f4").tobytes()
+        for roll, vector in zip(roll_nos, vectors)
+    )
+    return roll_nos, ndjson, binary
+
+
+def best_of(fn) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def seed(engine, roll_nos: list[str]):
+    from sqlalchemy.orm import Session
+
+    from app.models.attendance_token_models import AttendanceToken
+    from app.models.face_template_models import FaceTemplate
+    from app.models.room_face_registry_models import RoomFaceRegistry
+    from app.models.room_models import Room
+    from app.models.student_models import Student
+    from app.models.teacher_models import Teacher
+
+    tables = [
+        m.__table__
+        for m in (Teacher, Student, Room, AttendanceToken, FaceTemplate, RoomFaceRegistry)
+    ]
+    Teacher.metadata.create_all(engine, tables=tables)
+
+    teacher_id, room_id = uuid.uuid4(), uuid.uuid4()
+    with Session(engine) as db:
+        db.add(Teacher(id=teacher_id, full_name="Bench", email="bench@example.com", password_hash="x"))
+        db.flush()
+        db.add(
+            Room(
+                id=room_id,
+                room_code="BENCH1",
+                room_name="Bench",
+                teacher_id=teacher_id,
+                starting_roll=roll_nos[0],
+                ending_roll=roll_nos[-1],
+                capacity=len(roll_nos),
+            )
+        )
+        students = [
+            Student(
+                id=uuid.uuid4(),
+                full_name="Student",
+                roll_no=roll,
+                email=f"{roll}@example.com",
+                password_hash="x",
+            )
+            for roll in roll_nos
+        ]
+        db.add_all(students)
+        db.flush()
+        db.add_all(
+            AttendanceToken(
+                id=uuid.uuid4(),
+                room_id=room_id,
+                roll_no=student.roll_no,
+                token="T",
+                used=True,
+                assigned_student_id=student.id,
+            )
+            for student in students
+        )
+        db.commit()
+    return room_id, tables
+
+
+def main(students: int) -> None:
+    roll_nos, ndjson, binary = make_bodies(students)
+    print(f"{students} students: NDJSON {len(ndjson) / 1e6:.1f} MB, binary {len(binary) / 1e6:.2f} MB")
+
+    batches = {}
+    for name, body, parse in (
+        ("ndjson", ndjson, parse_ndjson_batch),
+        ("binary", binary, parse_binary_batch),
+    ):
+        parse_s, parsed = best_of(lambda: parse(body))
+        prepare_s, batch = best_of(lambda: prepare_batch(parsed[0], parsed[1], dict(parsed[2])))
+        batches[name] = batch
+        print(
+            f"{name:>6}: parse {parse_s * 1000:6.1f} ms, "
+            f"prepare {prepare_s * 1000:6.1f} ms ({len(batch.roll_nos)} valid)"
+        )
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        print("upsert: skipped (set BENCH_DATABASE_URL to a scratch Postgres database)")
+        return
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(url)
+    room_id, tables = seed(engine, roll_nos)
+    try:
+        # First run inserts every template, the second updates them all
+        for name, batch in batches.items():
+            with Session(engine) as db:
+                started = time.perf_counter()
+                enrolled = upsert_embeddings(db, room_id, batch)
+                db.commit()
+                elapsed = time.perf_counter() - started
+            print(f"{name:>6}: upsert {elapsed * 1000:6.1f} ms ({len(enrolled)} enrolled)")
+    finally:
+        tables[0].metadata.drop_all(engine, tables=tables)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,103 @@
+# bench/lookups.py
+#   python bench/lookups.py [iterations]
+#   BENCH_DATABASE_URL=postgresql+psycopg2://... python bench/lookups.py
+#
+# The four hot lookups of an authenticated join (session check, principal,
+# room by code, token by roll) built as ORM queries per call, as they used
+# to be, against the pre-built statements in app/services/repository.py.
+# Defaults to in-memory SQLite, which isolates the Python-side cost; point
+# BENCH_DATABASE_URL at a scratch Postgres database to include the round
+# trips (the tables are created and dropped there).
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, value in {
+    "user": "bench",
+    "password": "bench",
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models.attendance_token_models import AttendanceToken  # noqa: E402
+from app.models.room_models import Room  # noqa: E402
+from app.models.session_models import Session as UserSession  # noqa: E402
+from app.models.student_models import Student  # noqa: E402
+from app.models.teacher_models import Teacher  # noqa: E402
+from app.services import repository  # noqa: E402
+
+TABLES = [m.__table__ for m in (Teacher, Student, Room, AttendanceToken, UserSession)]
+WARMUP = 200
+
+teacher_id, room_id, session_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def seed(engine) -> None:
+    Teacher.metadata.create_all(engine, tables=TABLES)
+    with Session(engine) as db:
+        db.add(Teacher(id=teacher_id, full_name="Bench", email="bench@example.com", password_hash="x"))
+        db.flush()
+        db.add(
+            Room(
+                id=room_id,
+                room_code="BENCH1",
+                room_name="Bench",
+                teacher_id=teacher_id,
+                starting_roll="1",
+                ending_roll="9",
+                capacity=9,
+            )
+        )
+        db.flush()
+        db.add(AttendanceToken(id=uuid.uuid4(), room_id=room_id, roll_no="1", token="T"))
+        db.add(UserSession(id=session_id, user_id=teacher_id, device_id="d", refresh_hash=b"x" * 32))
+        db.commit()
+
+
+def orm_queries(db: Session) -> None:
+    db.query(UserSession).filter(
+        UserSession.id == session_id, UserSession.user_id == teacher_id
+    ).first()
+    db.query(Teacher).filter(Teacher.id == teacher_id).first()
+    db.query(Room).filter(Room.room_code == "BENCH1").first()
+    db.query(AttendanceToken).filter(
+        AttendanceToken.room_id == room_id, AttendanceToken.roll_no == "1"
+    ).first()
+
+
+def prebuilt_statements(db: Session) -> None:
+    repository.session_exists(db, session_id, teacher_id)
+    repository.teacher_by_id(db, teacher_id)
+    repository.room_by_code(db, "BENCH1")
+    repository.token_by_roll(db, room_id, "1")
+
+
+def main(iterations: int) -> None:
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+    engine = create_engine(url)
+    seed(engine)
+    try:
+        # Alternate twice so neither variant benefits from running last
+        for name, fn in [("ORM query per call", orm_queries), ("pre-built", prebuilt_statements)] * 2:
+            with Session(engine) as db:
+                for _ in range(WARMUP):
+                    fn(db)
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    fn(db)
+                elapsed = time.perf_counter() - started
+            print(f"{name:>18}: {elapsed / iterations * 1e6:7.0f} us per request (4 lookups)")
+    finally:
+        Teacher.metadata.drop_all(engine, tables=TABLES)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,82 @@
+# bench/startup_memory.py
+#   python bench/startup_memory.py [workers]
+#
+# Startup cost and per-worker memory of the preload + gc.freeze() setup in
+# gunicorn.conf.py. The app is imported once, warmed, then forked the way
+# gunicorn forks workers; each child runs a few collections (as a worker
+# would) and its private dirty memory is read from /proc (Linux only).
+# Runs once without and once with gc.freeze(). No database is needed.
+import gc
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, value in {
+    "user": "bench",
+    "password": "bench",
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+def private_dirty_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Private_Dirty"):
+                return int(line.split()[1])
+    return 0
+
+
+def run(freeze: bool, workers: int) -> None:
+    started = time.perf_counter()
+    import app.main  # noqa: F401
+    imported = time.perf_counter()
+
+    from app.services.warmup import warm_process
+
+    warm_process()
+    warmed = time.perf_counter()
+
+    gc.collect()
+    if freeze:
+        gc.freeze()
+
+    read_end, write_end = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(write_end)
+            for _ in range(3):
+                gc.collect()
+            os.read(read_end, 1)  # wait until the parent has measured
+            os._exit(0)
+        pids.append(pid)
+    os.close(read_end)
+
+    time.sleep(1)
+    per_worker = [private_dirty_kb(pid) / 1024 for pid in pids]
+    os.close(write_end)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    print(
+        f"{'gc.freeze' if freeze else 'no freeze':>9}: "
+        f"import {imported - started:.2f} s, warm_process {warmed - imported:.2f} s, "
+        f"private dirty per worker {sum(per_worker) / len(per_worker):.1f} MB "
+        f"(max {max(per_worker):.1f} MB, {workers} workers)"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        run(sys.argv[2] == "freeze", int(sys.argv[3]))
+    else:
+        workers = sys.argv[1] if len(sys.argv) > 1 else "4"
+        # Fresh interpreters, so both runs pay the full import
+        for mode in ("no-freeze", "freeze"):
+            subprocess.run([sys.executable, __file__, "--child", mode, workers], check=True)
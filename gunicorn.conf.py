@@ -0,0 +1,35 @@
+# gunicorn.conf.py
+#   gunicorn app.main:app -c gunicorn.conf.py
+#
+# The master imports the app once (preload_app) and warms everything that
+# needs no I/O; workers are forked from it and share those pages
+# copy-on-write. gc.freeze() moves the preloaded objects out of the
+# collector's generations, so collections in a worker do not touch (and
+# copy) them.
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported, before workers are forked
+    from app.services.warmup import warm_process
+
+    warm_process()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Never share pooled connections across processes; each worker opens its
+    # own (and warms them in the app's lifespan hook)
+    from app.database import engine, replica_engine
+
+    engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
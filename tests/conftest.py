@@ -0,0 +1,14 @@
+# tests/conftest.py
+import os
+
+# app.database builds its engine at import time; connecting is lazy, so
+# placeholders are enough for tests that never touch the primary
+for name, value in {
+    "user": "test",
+    "password": "test",
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "test",
+    "SECRET_KEY": "test-secret",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,30 @@
+# tests/test_attendance_upload.py
+import pytest
+
+from app.services.attendance_upload import parse_record
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"roll_no": "1", "token": "AB", "timestamp": 1e300}',
+        '{"roll_no": "1", "token": "AB", "timestamp": Infinity}',
+        '{"roll_no": "1", "token": "AB", "timestamp": 99999999999999999999}',
+        '{"roll_no": "1", "token": "AB", "timestamp": "Infinity"}',
+        '{"roll_no": "1", "token": "AB"}',
+    ],
+)
+def test_unrepresentable_timestamps_are_malformed(line):
+    record = parse_record(1, line, "ndjson", roll_width=3)
+
+    assert record.status == "rejected"
+    assert record.reason == "malformed"
+
+
+def test_csv_record_is_normalised():
+    record = parse_record(2, "7, abc, 2026-10-19T08:00:00", "csv", roll_width=3)
+
+    assert record.status == "pending"
+    assert record.roll_no == "007"
+    assert record.token == "ABC"
+    assert record.recorded_at.tzinfo is not None
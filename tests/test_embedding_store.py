@@ -0,0 +1,58 @@
+# tests/test_embedding_store.py
+import os
+import time
+import uuid
+
+import numpy as np
+
+from app.services.embedding_store import EmbeddingStore, dequantize
+
+
+def _matrix(n=50, dim=128):
+    rng = np.random.default_rng(7)
+    matrix = rng.standard_normal((n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _publish(store, room_id, matrix, as_of_ns=None):
+    n = len(matrix)
+    ids = [uuid.uuid4() for _ in range(n)]
+    return store.publish(
+        room_id, [f"{i:03}" for i in range(n)], ids, ids, matrix, as_of_ns=as_of_ns
+    )
+
+
+def test_quantized_store_holds_int8_only(tmp_path):
+    store = EmbeddingStore(str(tmp_path), quantized=True)
+    room_id, matrix = uuid.uuid4(), _matrix()
+
+    stored = _publish(store, room_id, matrix)
+
+    files = os.listdir(tmp_path / str(room_id) / stored.version)
+    assert "embeddings.npy" not in files
+    assert stored.matrix.dtype == np.int8
+    restored = dequantize(stored.matrix, stored.scales)
+    assert np.abs((restored * matrix).sum(axis=1) - 1).max() < 1e-3
+
+
+def test_current_never_moves_backwards(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    room_id = uuid.uuid4()
+    stale_read_at = time.time_ns()
+    newer = _publish(store, room_id, _matrix(), as_of_ns=time.time_ns())
+
+    # A slower rebuild that read the registry first publishes last
+    stale = _publish(store, room_id, _matrix(n=3), as_of_ns=stale_read_at)
+    assert stale.version == newer.version
+    assert store.current_version(room_id) == newer.version
+    assert len(store.open(room_id).roll_nos) == 50
+
+
+def test_missing_version_directory_is_a_miss(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    room_id = uuid.uuid4()
+    _publish(store, room_id, _matrix())
+
+    (tmp_path / str(room_id) / "CURRENT").write_text("v2")
+
+    assert store.open(room_id) is None
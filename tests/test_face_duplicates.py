@@ -0,0 +1,58 @@
+# tests/test_face_duplicates.py
+import numpy as np
+import pytest
+
+from app.services.face_duplicates import find_similar_pairs
+
+
+def _normalised(n, dim=16, seed=3):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _brute_force(matrix, threshold):
+    scores = matrix @ matrix.T
+    rows, cols = np.nonzero(np.triu(scores >= threshold, k=1))
+    return {(i, j): scores[i, j] for i, j in zip(rows.tolist(), cols.tolist())}
+
+
+# Block sizes that do not divide n, so pairs straddle tile boundaries
+@pytest.mark.parametrize("block_size", [7, 16, 50, 1000])
+def test_tiled_pairs_match_brute_force(block_size):
+    matrix = _normalised(101)
+    expected = _brute_force(matrix, 0.3)
+
+    rows, cols, similarities = find_similar_pairs(
+        matrix, threshold=0.3, block_size=block_size, workers=4
+    )
+
+    assert len(expected) > 50
+    assert (rows < cols).all()
+    assert {(i, j) for i, j in zip(rows.tolist(), cols.tolist())} == set(expected)
+    for i, j, similarity in zip(rows.tolist(), cols.tolist(), similarities.tolist()):
+        assert similarity == pytest.approx(float(expected[i, j]), abs=1e-5)
+    assert (np.diff(similarities) <= 0).all()
+
+
+@pytest.mark.parametrize("block_size", [7, 16, 1000])
+def test_limit_keeps_the_global_top_pairs(block_size):
+    matrix = _normalised(101)
+    expected = sorted(_brute_force(matrix, 0.1).values(), reverse=True)[:25]
+
+    rows, cols, similarities = find_similar_pairs(
+        matrix, threshold=0.1, limit=25, block_size=block_size, workers=4
+    )
+
+    assert len(similarities) == 25
+    assert similarities.tolist() == pytest.approx([float(s) for s in expected], abs=1e-5)
+
+
+def test_planted_duplicates_across_tiles_are_found():
+    matrix = _normalised(60)
+    matrix[55] = matrix[2]  # far apart: different tiles at block_size=8
+    matrix[9] = matrix[8]  # same tile
+
+    rows, cols, _ = find_similar_pairs(matrix, threshold=0.999, block_size=8)
+
+    assert set(zip(rows.tolist(), cols.tolist())) == {(2, 55), (8, 9)}
@@ -0,0 +1,54 @@
+# tests/test_face_embeddings.py
+import json
+import struct
+
+import numpy as np
+
+from app.services.face_embeddings import (
+    FACE_EMBEDDING_DIM,
+    parse_binary_batch,
+    parse_ndjson_batch,
+    prepare_batch,
+)
+
+
+def _record(roll: bytes, value: float) -> bytes:
+    vector = np.full(FACE_EMBEDDING_DIM, value, dtype="<f4").tobytes()
+    return struct.pack("<H", len(roll)) + roll + vector
+
+
+def test_non_utf8_roll_is_rejected_and_parsing_continues():
+    body = _record(b"001", 1.0) + _record(b"\xff\xfe", 2.0) + _record(b"003", 3.0)
+
+    roll_nos, matrix, rejected = parse_binary_batch(body)
+
+    assert roll_nos == ["001", "003"]
+    assert matrix[:, 0].tolist() == [1.0, 3.0]
+    assert rejected == {"record 2": "malformed"}
+
+
+def test_truncated_trailer_keeps_complete_records():
+    body = _record(b"001", 1.0) + _record(b"002", 2.0)[:-4]
+
+    roll_nos, matrix, rejected = parse_binary_batch(body)
+
+    assert roll_nos == ["001"]
+    assert matrix.shape == (1, FACE_EMBEDDING_DIM)
+    assert rejected == {"trailer": "truncated"}
+
+
+def test_non_numeric_embedding_rejects_only_that_roll():
+    good = json.dumps([1.0] * FACE_EMBEDDING_DIM)
+    body = "\n".join(
+        [
+            f'{{"roll_no": "001", "embedding": {good}}}',
+            f'{{"roll_no": "002", "embedding": {json.dumps(["x"] * FACE_EMBEDDING_DIM)}}}',
+            f'{{"roll_no": "003", "embedding": {good}}}',
+        ]
+    ).encode()
+
+    batch = prepare_batch(*parse_ndjson_batch(body))
+
+    assert batch.roll_nos == ["001", "003"]
+    assert batch.vectors.shape == (2, FACE_EMBEDDING_DIM)
+    assert batch.rejected == {"002": "malformed"}
@@ -0,0 +1,38 @@
+# tests/test_rate_limit.py
+from starlette.requests import Request
+
+from app.services.rate_limit import RateLimiter, _account
+from app.utils.jwt import create_access_token
+
+
+def _request(authorization=None):
+    headers = [] if authorization is None else [(b"authorization", authorization.encode())]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers})
+
+
+def test_rejected_client_does_not_drain_the_room():
+    limiter = RateLimiter()
+    room = [("join:room:abc", (2, 0.001))]
+
+    assert limiter.check([("join:ip:a", (1, 0.001))], room) == 0
+    # Client a is over its own limit: its retries never reach the room bucket
+    for _ in range(5):
+        assert limiter.check([("join:ip:a", (1, 0.001))], room) > 0
+
+    assert limiter.check([("join:ip:b", (1, 0.001))], room) == 0
+    assert limiter.check([("join:ip:c", (1, 0.001))], room) > 0  # room now spent
+
+
+def test_account_key_is_the_verified_subject():
+    first = create_access_token({"sub": "student-1", "sid": "s1"})
+    second = create_access_token({"sub": "student-1", "sid": "s2"})
+
+    # A fresh sign-in is still the same account
+    assert _account(_request(f"Bearer {first}"), "10.0.0.1") == "sub:student-1"
+    assert _account(_request(f"Bearer {second}"), "10.0.0.2") == "sub:student-1"
+
+    # Anything unverifiable falls back to the caller's address
+    forged = first[:-4] + "AAAA"
+    assert _account(_request(f"Bearer {forged}"), "10.0.0.1") == "ip:10.0.0.1"
+    assert _account(_request("Bearer junk"), "10.0.0.1") == "ip:10.0.0.1"
+    assert _account(_request(), "10.0.0.1") == "ip:10.0.0.1"
@@ -0,0 +1,60 @@
+# tests/test_room_code.py
+import random
+
+import pytest
+
+from app.utils import room_code
+from app.utils.room_code import (
+    ROOM_CODE_ALPHABET,
+    ROOM_CODE_LENGTH,
+    ROOM_CODE_SPACE,
+    encode_room_code,
+    permute,
+    room_code_for,
+    unpermute,
+)
+
+
+@pytest.mark.parametrize("half_space", [2, 7, 36, 216])
+def test_permute_is_bijective_on_reduced_domain(monkeypatch, half_space):
+    # Same Feistel network, smaller halves: the full space is checked exhaustively
+    monkeypatch.setattr(room_code, "_HALF_SPACE", half_space)
+    monkeypatch.setattr(room_code, "ROOM_CODE_SPACE", half_space * half_space)
+    space = half_space * half_space
+
+    images = [permute(i) for i in range(space)]
+
+    assert sorted(images) == list(range(space))
+    assert all(unpermute(v) == i for i, v in enumerate(images))
+
+
+def test_permute_round_trips_on_full_space_samples():
+    rng = random.Random(20261019)
+    samples = [0, 1, ROOM_CODE_SPACE - 1] + [rng.randrange(ROOM_CODE_SPACE) for _ in range(20_000)]
+
+    images = {}
+    for index in samples:
+        value = permute(index)
+        assert 0 <= value < ROOM_CODE_SPACE
+        assert unpermute(value) == index
+        # Distinct inputs never collide
+        assert images.setdefault(value, index) == index
+
+
+def test_permute_rejects_out_of_range():
+    for bad in (-1, ROOM_CODE_SPACE):
+        with pytest.raises(ValueError):
+            permute(bad)
+        with pytest.raises(ValueError):
+            unpermute(bad)
+
+
+def test_room_codes_are_fixed_length_and_distinct():
+    codes = [room_code_for(n) for n in range(1, 5001)]
+
+    assert len(set(codes)) == len(codes)
+    for code in codes:
+        assert len(code) == ROOM_CODE_LENGTH
+        assert set(code) <= set(ROOM_CODE_ALPHABET)
+    assert encode_room_code(0) == ROOM_CODE_ALPHABET[0] * ROOM_CODE_LENGTH
+    assert encode_room_code(ROOM_CODE_SPACE - 1) == ROOM_CODE_ALPHABET[-1] * ROOM_CODE_LENGTH
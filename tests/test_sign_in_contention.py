@@ -0,0 +1,94 @@
+# tests/test_sign_in_contention.py
+import os
+import threading
+import uuid
+
+import pytest
+from jose import jwt
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints.auth.student_auth_router import student_sign_in
+from app.api.v1.endpoints.auth.teacher_auth_router import teacher_sign_in
+from app.models.session_models import Session as UserSession
+from app.models.student_models import Student
+from app.models.teacher_models import Teacher
+from app.schemas.student_schema import StudentLogin
+from app.schemas.teacher_schema import TeacherLogin
+from app.utils.jwt import ALGORITHM, SECRET_KEY, hash_token
+from app.utils.security import hash_password
+
+# Needs a real Postgres: the upsert relies on ON CONFLICT and row locking
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+DEVICES = 8
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set"
+)
+
+
+@pytest.fixture(scope="module")
+def session_factory():
+    engine = create_engine(TEST_DATABASE_URL, pool_size=DEVICES)
+    tables = [Student.__table__, Teacher.__table__, UserSession.__table__]
+    Student.metadata.create_all(engine, tables=tables)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Student.metadata.drop_all(engine, tables=tables)
+    engine.dispose()
+
+
+def _account(db, model):
+    email = f"{uuid.uuid4().hex}@example.com"
+    fields = {"roll_no": uuid.uuid4().hex[:10]} if model is Student else {}
+    user = model(
+        full_name="Contended User",
+        email=email,
+        password_hash=hash_password("secret1"),
+        **fields,
+    )
+    db.add(user)
+    db.commit()
+    return user.id, email
+
+
+@pytest.mark.parametrize(
+    "model, login, sign_in",
+    [(Student, StudentLogin, student_sign_in), (Teacher, TeacherLogin, teacher_sign_in)],
+)
+def test_concurrent_sign_in_leaves_one_session(session_factory, model, login, sign_in):
+    with session_factory() as db:
+        user_id, email = _account(db, model)
+
+    barrier = threading.Barrier(DEVICES)
+    results, errors = [], []
+
+    def device(n):
+        payload = login(email=email, password="secret1", device_id=f"device-{n}")
+        with session_factory() as db:
+            barrier.wait()
+            try:
+                results.append(sign_in(payload, db=db))
+            except Exception as exc:  # deadlocks / unique violations surface here
+                errors.append(exc)
+
+    threads = [threading.Thread(target=device, args=(n,)) for n in range(DEVICES)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not errors
+    assert len(results) == DEVICES
+
+    with session_factory() as db:
+        sessions = db.execute(
+            select(UserSession).where(UserSession.user_id == user_id)
+        ).scalars().all()
+
+    # Exactly one device wins, and its row is internally consistent: the
+    # stored refresh digest belongs to the same sign-in as the session id
+    assert len(sessions) == 1
+    by_hash = {hash_token(r["refresh_token"]): r for r in results}
+    winner = by_hash[sessions[0].refresh_hash]
+    claims = jwt.decode(winner["refresh_token"], SECRET_KEY, algorithms=[ALGORITHM])
+    assert claims["sid"] == str(sessions[0].id)